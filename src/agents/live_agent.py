@@ -1,4 +1,6 @@
+import inspect
 import logging
+import time
 from collections.abc import AsyncGenerator, Callable
 from dataclasses import dataclass
 from enum import StrEnum, auto
@@ -35,6 +37,9 @@ class LiveAgentConfig(TypedDict):
     VAD_SILENCE_DURATION_MS: NotRequired[int]
     VAD_PREFIX_PADDING_MS: NotRequired[int]
     DIALECT: NotRequired[str]
+    VOICE_NAME: NotRequired[str]
+    # "text" sessions skip speech synthesis, transcription and VAD entirely
+    RESPONSE_MODALITY: NotRequired[Literal["audio"] | Literal["text"]]
 
 
 class MessageType(StrEnum):
@@ -46,6 +51,7 @@ class MessageType(StrEnum):
     INTERRUPTION = auto()
     TOOL_CALL_CANCELLED = auto()
     TOOL_CALL_RESPONSE = auto()
+    TURN_COMPLETE = auto()
 
 
 @dataclass
@@ -60,14 +66,43 @@ class LiveAgent:
         self.__client = genai.Client(api_key=config.get("API_KEY"))
         self.__dialect = config.get("DIALECT")
 
+        self.text_only = config.get("RESPONSE_MODALITY") == "text"
+        system_instruction = Content(
+            parts=[Part.from_text(text=config.get("SYSTEM_PROMPT"))]
+        )
+
+        if self.text_only:
+            self.__live_config = LiveConnectConfig(
+                response_modalities=[Modality.TEXT],
+                tools=tools,
+                system_instruction=system_instruction,
+            )
+        else:
+            self.__live_config = self.__get_audio_live_config(
+                config, tools, system_instruction
+            )
+
+        self.__model = config.get("MODEL")
+        self.__functions_to_call = {tool.__name__: tool for tool in tools}
+        self._interrupted_tool_calls = set()
+        # Incremented on every server interruption; audio from older generations is stale
+        self.generation = 0
+
+    @classmethod
+    def __get_audio_live_config(
+        cls,
+        config: LiveAgentConfig,
+        tools: list[Callable[..., Any]],
+        system_instruction: Content,
+    ) -> LiveConnectConfig:
         # Build the live config with improved VAD settings
-        audio_transcription_config = self.__get_transcroption_config(config)
-        realtime_input_config = self.__get_realtime_input_config(config)
+        audio_transcription_config = cls.__get_transcroption_config(config)
+        realtime_input_config = cls.__get_realtime_input_config(config)
         voice_name = config.get("VOICE_NAME")
         if not voice_name:
             logger.warning("VOICE_NAME not specified in config, using default voice.")
-            
-        self.__live_config = LiveConnectConfig(
+
+        return LiveConnectConfig(
             response_modalities=[Modality.AUDIO],
             speech_config=SpeechConfig(
                 voice_config=VoiceConfig(
@@ -77,18 +112,12 @@ class LiveAgent:
                 ),
             ),
             tools=tools,
-            system_instruction=Content(
-                parts=[Part.from_text(text=config.get("SYSTEM_PROMPT"))]
-            ),
+            system_instruction=system_instruction,
             input_audio_transcription=audio_transcription_config,
             output_audio_transcription=audio_transcription_config,
             realtime_input_config=realtime_input_config,
         )
 
-        self.__model = config.get("MODEL")
-        self.__functions_to_call = {tool.__name__: tool for tool in tools}
-        self._interrupted_tool_calls = set()
-
     @staticmethod
     def __get_transcroption_config(config: LiveAgentConfig):
         if config.get("ENABLE_TRANSCRIPTION"):
@@ -153,6 +182,13 @@ class LiveAgent:
             turn_complete=True,
         )
 
+    async def send_context(self, text: str, role: str = "model"):
+        """Add a turn to the conversation history without asking for a response"""
+        await self._session.send_client_content(
+            turns=Content(role=role, parts=[Part(text=text)]),
+            turn_complete=False,
+        )
+
     async def send_audio(self, audio: bytes):
         """Send audio using realtime input for better VAD handling"""
         await self._session.send_realtime_input(
@@ -180,11 +216,17 @@ class LiveAgent:
         async for message in self._session.receive():
             # Handle server-side interruptions
             if message.server_content and message.server_content.interrupted:
+                received_at = time.monotonic()
+                self.generation += 1
                 logger.info("Server detected interruption")
                 yield AgentMessage(
                     type=MessageType.INTERRUPTION,
                     data=True,
-                    metadata={"source": "server_vad"},
+                    metadata={
+                        "source": "server_vad",
+                        "generation": self.generation,
+                        "received_at": received_at,
+                    },
                 )
                 continue
 
@@ -202,7 +244,8 @@ class LiveAgent:
                     data=message.server_content.output_transcription.text,
                 )
 
-            # Handle model content (text and audio)
+            # Handle model content (text and audio). `message.text` is only these parts'
+            # text joined, so it is not yielded again
             if (
                 message.server_content
                 and message.server_content.model_turn
@@ -217,9 +260,9 @@ class LiveAgent:
                             data=part.inline_data.data,
                         )
 
-            # Handle direct text messages
-            if message.text:
-                yield AgentMessage(type=MessageType.TEXT, data=message.text)
+            # Handle end of the model's turn
+            if message.server_content and message.server_content.turn_complete:
+                yield AgentMessage(type=MessageType.TURN_COMPLETE, data=True)
 
             # Handle tool calls with improved error handling
             if message.tool_call and message.tool_call.function_calls:
@@ -243,10 +286,13 @@ class LiveAgent:
                             if 'original_dialect' not in fc.args and self.__dialect:
                                 fc.args['original_dialect'] = self.__dialect
 
-                            logger.info(f"Calling tool: {fc.name} with args: {fc.args}")
+                            # Argument values can hold personal data (names, phone numbers)
+                            logger.info(f"Calling tool: {fc.name} with args: {sorted(fc.args)}")
                             
                             # Execute tool
                             tool_output = self.__functions_to_call[fc.name](**fc.args)
+                            if inspect.isawaitable(tool_output):
+                                tool_output = await tool_output
                             
                             # Standardize tool output
                             if isinstance(tool_output, dict):
@@ -265,6 +311,11 @@ class LiveAgent:
                             yield AgentMessage(
                                 type=MessageType.TOOL_CALL_RESPONSE,
                                 data=response_payload,
+                                # Only the unit referenced, never personal data
+                                metadata={
+                                    "name": fc.name,
+                                    "unit_code": fc.args.get("unit_code"),
+                                },
                             )
 
                             function_responses.append(function_response)
@@ -4,7 +4,6 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 ENABLE_RATE_LIMIT = os.getenv("ENABLE_RATE_LIMIT", "")
@@ -42,3 +41,98 @@ if not MALE_VOICE_NAME:
 FEMALE_VOICE_NAME = os.getenv("FEMALE_VOICE_NAME", "")
 if not FEMALE_VOICE_NAME:
     raise ValueError("ERROR: FEMALE_VOICE_NAME not found in .env file")
+
+# --- Outbound audio framing ---
+# Live API audio parts are coalesced into frames of this duration before being sent
+AUDIO_OUT_FRAME_MS = int(os.getenv("AUDIO_OUT_FRAME_MS", "60"))
+# Upper bound on how long a partial frame may wait before it is flushed anyway
+AUDIO_OUT_MAX_DELAY_MS = int(os.getenv("AUDIO_OUT_MAX_DELAY_MS", "120"))
+
+# --- Outbound send queue ---
+OUTBOUND_QUEUE_MAX_SIZE = int(os.getenv("OUTBOUND_QUEUE_MAX_SIZE", "256"))
+# "drop_oldest_audio" sheds queued audio when full, "disconnect" closes the client
+OUTBOUND_QUEUE_OVERFLOW_POLICY = os.getenv(
+    "OUTBOUND_QUEUE_OVERFLOW_POLICY", "drop_oldest_audio"
+)
+# A single client write taking longer than this is treated as a dead client
+OUTBOUND_SEND_TIMEOUT_S = float(os.getenv("OUTBOUND_SEND_TIMEOUT_S", "10"))
+
+# --- Inbound microphone framing ---
+# Client microphone chunks are batched into frames of this duration before going upstream
+AUDIO_IN_FRAME_MS = int(os.getenv("AUDIO_IN_FRAME_MS", "100"))
+AUDIO_IN_MAX_DELAY_MS = int(os.getenv("AUDIO_IN_MAX_DELAY_MS", "120"))
+
+# --- Server-side silence gate ---
+# When enabled, only detected speech (plus VAD prefix/suffix padding) is sent upstream
+SILENCE_GATE_ENABLED = os.getenv("SILENCE_GATE_ENABLED", "").lower() in ("1", "true", "yes")
+# Send a short frame of digital silence this often while gated (0 disables)
+SILENCE_GATE_KEEPALIVE_MS = int(os.getenv("SILENCE_GATE_KEEPALIVE_MS", "0"))
+
+# --- Audio DSP worker processes ---
+# Resampling and encoding run in this many worker processes (0 keeps them on the event loop)
+AUDIO_DSP_WORKERS = int(os.getenv("AUDIO_DSP_WORKERS", "0"))
+# Largest audio block that can be shipped to a worker through shared memory
+AUDIO_DSP_SLOT_BYTES = int(os.getenv("AUDIO_DSP_SLOT_BYTES", str(64 * 1024)))
+
+# --- Transcription delta coalescing ---
+# Transcription deltas are held at most this long before being flushed at a word boundary
+TRANSCRIPT_WINDOW_MS = int(os.getenv("TRANSCRIPT_WINDOW_MS", "300"))
+# Flush once this many complete words are buffered
+TRANSCRIPT_MAX_WORDS = int(os.getenv("TRANSCRIPT_MAX_WORDS", "4"))
+# A word still streaming in is held back from timed flushes at most this long
+TRANSCRIPT_MAX_HOLD_MS = int(os.getenv("TRANSCRIPT_MAX_HOLD_MS", "1000"))
+
+# --- Outbound message compression ---
+# Sessions that ask for "compression": "deflate" get larger JSON messages deflated
+WS_COMPRESSION_ENABLED = os.getenv("WS_COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Messages whose JSON is smaller than this are always sent uncompressed
+WS_COMPRESSION_THRESHOLD_BYTES = int(os.getenv("WS_COMPRESSION_THRESHOLD_BYTES", "1024"))
+WS_COMPRESSION_LEVEL = int(os.getenv("WS_COMPRESSION_LEVEL", "6"))
+
+# --- Outbound message envelope ---
+# Stamp each message with milliseconds since the session started (clients may opt out)
+ENVELOPE_TIMESTAMPS = os.getenv("ENVELOPE_TIMESTAMPS", "true").lower() in ("1", "true", "yes")
+
+# --- Logging ---
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Per-module levels, e.g. "utils.audio_aggregator=WARNING,agents.live_agent=DEBUG"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "google_genai.types=ERROR")
+# High-frequency events (per audio chunk, per message) are logged at most this often per session
+LOG_SAMPLED_EVENTS_PER_S = float(os.getenv("LOG_SAMPLED_EVENTS_PER_S", "1"))
+
+# --- System prompt ---
+# How the project knowledge base is included: "full" (inline dict dumps), "compact"
+# (inline once, compactly serialized) or "slim" (fetched with the get_project_info tool)
+PROMPT_VARIANT = os.getenv("PROMPT_VARIANT", "full")
+
+# --- Unit catalog sync ---
+# Clients asking for it get a versioned unit catalog plus deltas, and tool responses
+# then reference units by code
+CATALOG_SYNC_ENABLED = os.getenv("CATALOG_SYNC_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# --- Speculative tool prefetch ---
+# Start likely unit lookups from the input transcript before the model calls the tool
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+PREFETCH_MAX_PER_TURN = int(os.getenv("PREFETCH_MAX_PER_TURN", "4"))
+
+# --- Greeting cache ---
+# The first greeting generated per voice, dialect, language and agent name is stored
+# and played to later callers while their Live session connects. Greetings are only
+# recorded from a fixed server-side instruction, before the caller has said anything.
+GREETING_CACHE_ENABLED = os.getenv("GREETING_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+GREETING_CACHE_DIR = os.getenv("GREETING_CACHE_DIR", ".cache/greetings")
+GREETING_CACHE_MAX_ENTRIES = int(os.getenv("GREETING_CACHE_MAX_ENTRIES", "64"))
+GREETING_CACHE_TTL_S = float(os.getenv("GREETING_CACHE_TTL_S", str(7 * 86400)))
+# Cached greetings are replayed in frames of this duration, so even a long greeting
+# stays well below OUTBOUND_QUEUE_MAX_SIZE (and within AUDIO_DSP_SLOT_BYTES)
+GREETING_FRAME_MS = int(os.getenv("GREETING_FRAME_MS", "500"))
+
+# --- Unit change notifications ---
+# Sessions are told when units they discussed change availability, price, etc.
+UNIT_UPDATES_ENABLED = os.getenv("UNIT_UPDATES_ENABLED", "true").lower() in ("1", "true", "yes")
+# How often watched projects are refetched past the units cache (0 disables polling)
+UNIT_REFRESH_INTERVAL_S = float(os.getenv("UNIT_REFRESH_INTERVAL_S", "60"))
+# Units watched per session; the least recently discussed drop out beyond this
+UNIT_WATCH_MAX = int(os.getenv("UNIT_WATCH_MAX", "100"))
+# Also add each update to the model's context as a note
+UNIT_UPDATES_TO_MODEL = os.getenv("UNIT_UPDATES_TO_MODEL", "false").lower() in ("1", "true", "yes")
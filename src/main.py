@@ -2,6 +2,7 @@ import asyncio
 import base64
 import json
 import logging
+import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Dict, Any
@@ -15,39 +16,119 @@ from pydantic import BaseModel, Field
 
 import config as config
 from agents.live_agent import LiveAgent, MessageType
-from prompts.live_prompt import custom_agent_prompt
-from utils.audio_codec import AudioCodec
+from prompts.live_prompt import GREETING_INSTRUCTION, custom_agent_prompt, prompt_stats
+from prompts.prompt_budget import analyze as analyze_prompt_budget
+from utils.audio_aggregator import AudioFrameAggregator
+from utils.audio_codec import AudioCodec, PcmNormalizer
+from utils.audio_encoder import OutboundAudioEncoder
+from utils.compression import MessageCompressor
+from utils.dsp_executor import AudioDspExecutor
+from utils.envelope import EnvelopeEncoder
+from utils.greeting_cache import BYTES_PER_SECOND, GreetingCache, GreetingRecorder
+from utils.logging_config import (
+    LogContext,
+    configure_logging,
+    log_sampled,
+    parse_levels,
+    shutdown_logging,
+)
+from utils.outbound_queue import OutboundQueue, SendPriority
+from utils.silence_gate import SilenceGate
+from utils.transcript_aggregator import TranscriptAggregator
 from tools import units_fetcher
-from tools import get_project_units, save_lead, finalize_response
+from tools import (
+    finalize_response,
+    find_similar_units,
+    get_project_info,
+    get_project_units,
+    get_unit_statistics,
+    save_lead,
+)
+from tools.prefetch import ToolPrefetcher
+from tools.unit_catalog import CatalogSync
+from tools.unit_changes import UNIT_CHANGES, describe_update, referenced_codes, resolve_codes
+from tools.unit_projection import projection_stats
+from tools.unit_snapshot import get_snapshot, refresh_snapshot
+
+
+# Configure logging: records are written by a background thread, off the event loop
+configure_logging(config.LOG_LEVEL, parse_levels(config.LOG_LEVELS))
+logger = logging.getLogger(__name__)
 
+# Worker processes for resampling / encoding, when AUDIO_DSP_WORKERS > 0
+dsp_executor: AudioDspExecutor | None = None
+# Greetings played while new sessions connect, when GREETING_CACHE_ENABLED
+greeting_cache: GreetingCache | None = None
 
-# Configure logging
-logging.getLogger("google_genai.types").setLevel(logging.ERROR)
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+
+async def poll_unit_changes(interval_s: float):
+    """Refreshes the units of projects sessions are watching, feeding `UNIT_CHANGES`"""
+    while True:
+        await asyncio.sleep(interval_s)
+        for project_id in UNIT_CHANGES.watched_projects():
+            try:
+                await asyncio.to_thread(refresh_snapshot, project_id)
+            except Exception as e:
+                logger.warning(f"Failed to refresh units of {project_id}: {e}")
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """Application lifespan management - database initialization removed"""
+    global dsp_executor, greeting_cache
     logger.info("Application starting up...")
     if getattr(config, "ENABLE_RATE_LIMIT", False):
         redis_connection = redis.from_url(
             config.REDIS_URL, encoding="utf-8", decode_responses=True
         )
         await FastAPILimiter.init(redis_connection)
+    if config.AUDIO_DSP_WORKERS > 0:
+        dsp_executor = AudioDspExecutor(
+            workers=config.AUDIO_DSP_WORKERS, slot_bytes=config.AUDIO_DSP_SLOT_BYTES
+        )
+        dsp_executor.start()
+    if config.GREETING_CACHE_ENABLED:
+        greeting_cache = GreetingCache(
+            config.GREETING_CACHE_DIR,
+            max_entries=config.GREETING_CACHE_MAX_ENTRIES,
+            ttl_s=config.GREETING_CACHE_TTL_S,
+        )
+    unit_poller = None
+    if config.UNIT_UPDATES_ENABLED and config.UNIT_REFRESH_INTERVAL_S > 0:
+        unit_poller = asyncio.create_task(poll_unit_changes(config.UNIT_REFRESH_INTERVAL_S))
     yield
+    if unit_poller:
+        unit_poller.cancel()
+    if dsp_executor:
+        await dsp_executor.aclose()
+        dsp_executor = None
     logger.info("Application shutting down...")
+    shutdown_logging()
 
 
 app = FastAPI(title="Voomi Live WebSocket", lifespan=lifespan)
 
 
+@asynccontextmanager
+async def cancel_on_exit(task: asyncio.Task):
+    """Cancels `task` when the block exits, including when entering a later context fails"""
+    try:
+        yield task
+    finally:
+        task.cancel()
+
+# Per-session components exposing `stats()`, keyed by session id
+active_sessions: Dict[str, Dict[str, Any]] = {}
+
+
 class ClientData(BaseModel):
     """WebSocket client data model"""
     text: str | None = None
     audio: str | None = None
     audio_stream_end: bool = Field(default=False)
+    # Unit catalog sync request, with the catalog version the client holds, if any
+    catalog_sync: bool = Field(default=False)
+    catalog_version: str | None = None
 
 
 websocket_dependencies = []
@@ -73,133 +154,531 @@ async def websocket_endpoint(ws: WebSocket):
     agent_gender = parsed_data.get("data", {}).get("persona")
     agent_name = parsed_data.get("data", {}).get("name")
     language = parsed_data.get("data", {}).get("language")
+    # Capture format of raw PCM microphone chunks (WAV chunks describe themselves)
+    input_sample_rate = parsed_data.get("data", {}).get("input_sample_rate") or 16000
+    input_channels = parsed_data.get("data", {}).get("input_channels") or 1
+    # Negotiated outbound audio format, e.g. "mulaw" at 8000 Hz for poor mobile links
+    output_codec = parsed_data.get("data", {}).get("output_codec") or "pcm"
+    output_sample_rate = parsed_data.get("data", {}).get("output_sample_rate")
+    # Chat widgets can ask for "text" sessions: no speech synthesis, audio or transcripts
+    text_only = parsed_data.get("data", {}).get("mode") == "text"
+    # Clients able to inflate binary frames can ask for large JSON messages deflated
+    compression = parsed_data.get("data", {}).get("compression")
+    # Per-message timestamps can be switched off by clients that do not use them
+    timestamps = parsed_data.get("data", {}).get("timestamps", config.ENVELOPE_TIMESTAMPS)
+    # Clients keeping a unit catalog send true, or the catalog version they persisted
+    catalog = parsed_data.get("data", {}).get("catalog")
     voice_name = (config.FEMALE_VOICE_NAME if agent_gender == "female" else config.MALE_VOICE_NAME)
 
     logger.info(f"WebSocket connected - Dialect: {dialect}, Agent Name: {agent_name}, Agent Gender: {agent_gender}, Voice: {voice_name}, Language: {language}")
 
     # Initialize agent and session
-    session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    # Unique per connection: it keys this session's stats, logs and DSP streams
+    session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    project_id = "ehya-marina"
+    # Tags every record of this session's tasks with the session id and turn number
+    log_context = LogContext(session_id, rate_per_s=config.LOG_SAMPLED_EVENTS_PER_S).bind()
     logger.info(f"Created session: {session_id}")
 
     # Tools setup
-    tools = [get_project_units, save_lead, finalize_response]
+    tools = [
+        get_project_units,
+        get_unit_statistics,
+        find_similar_units,
+        save_lead,
+        finalize_response,
+    ]
+    if config.PROMPT_VARIANT == "slim":
+        # The slim prompt leaves project knowledge to this tool
+        tools.append(get_project_info)
+
+    # Runs the unit lookup the caller is asking for while they are still speaking
+    prefetcher = None
+    if config.PREFETCH_ENABLED:
+        prefetcher = ToolPrefetcher(project_id, max_per_turn=config.PREFETCH_MAX_PER_TURN)
+        tools[tools.index(get_project_units)] = prefetcher.wrap(get_project_units)
+
+    envelope = EnvelopeEncoder(session_id, timestamps=bool(timestamps))
+    compressor = None
+    if compression == "deflate" and config.WS_COMPRESSION_ENABLED:
+        compressor = MessageCompressor(
+            threshold_bytes=config.WS_COMPRESSION_THRESHOLD_BYTES,
+            level=config.WS_COMPRESSION_LEVEL,
+        )
 
     async def send_json_streaming(type_: str, data):
         """Send JSON message to client with streaming support"""
         try:
-            logger.debug(f"Sending {type_} message")
+            message = envelope.encode(type_, data)
+            if compressor and (compressed := compressor.compress(type_, message)):
+                await ws.send_bytes(compressed)
+            else:
+                await ws.send_text(message.decode("utf-8"))
+            log_sampled(logger, logging.DEBUG, type_, "Sent %s to client", type_)
 
-            await ws.send_json(
-                {
-                    "type": type_,
-                    "data": data,
+        except Exception as e:
+            logger.error(f"Failed to send {type_} message: {e}")
+
+    # Bounded queue drained by a dedicated writer task, so slow client writes
+    # never block draining of the Live session
+    outbound_queue = OutboundQueue(
+        send=send_json_streaming,
+        max_size=config.OUTBOUND_QUEUE_MAX_SIZE,
+        overflow_policy=config.OUTBOUND_QUEUE_OVERFLOW_POLICY,
+        send_timeout=config.OUTBOUND_SEND_TIMEOUT_S,
+    )
+
+    try:
+        audio_encoder = OutboundAudioEncoder(
+            output_codec, int(output_sample_rate) if output_sample_rate else None
+        )
+    except ValueError as e:
+        logger.warning(f"Unsupported output audio format, using default: {e}")
+        audio_encoder = OutboundAudioEncoder()
+    try:
+        input_sample_rate, input_channels = PcmNormalizer.check_format(
+            input_sample_rate, input_channels
+        )
+    except ValueError as e:
+        logger.warning(f"Unsupported input audio format, using default: {e}")
+        input_sample_rate, input_channels = 16000, 1
+
+    dsp = None
+    unit_watch = None
+    try:
+        # Offload resampling / encoding to the DSP workers when they are running
+        dsp = dsp_executor.session(session_id) if dsp_executor and not text_only else None
+        if dsp:
+            dsp.open(
+                "encode",
+                "encode",
+                codec=audio_encoder.codec.value,
+                sample_rate=audio_encoder.sample_rate,
+            )
+            if input_sample_rate != 16000 or input_channels != 1:
+                dsp.open(
+                    "normalize",
+                    "normalize",
+                    sample_rate=input_sample_rate,
+                    channels=input_channels,
+                )
+
+        async def send_audio_frame(pcm: bytes):
+            """Encode a coalesced frame and queue it as an audio-delta"""
+            # Captured before any await so a barge-in during encoding marks it stale
+            generation = outbound_queue.generation
+            if dsp and not audio_encoder.is_passthrough:
+                payload = (await dsp.process("encode", pcm)).decode("ascii")
+            else:
+                payload = audio_encoder.encode(pcm)
+            await outbound_queue.put("audio-delta", payload, SendPriority.AUDIO, generation)
+
+        # Coalesce the small Live API audio parts into fixed-duration frames
+        audio_aggregator = AudioFrameAggregator(
+            send=send_audio_frame,
+            frame_ms=config.AUDIO_OUT_FRAME_MS,
+            max_delay_ms=config.AUDIO_OUT_MAX_DELAY_MS,
+        )
+        active_sessions[session_id] = {
+            "audio_out": audio_aggregator,
+            "outbound_queue": outbound_queue,
+            "audio_encoder": audio_encoder,
+        }
+        if compressor:
+            active_sessions[session_id]["compression"] = compressor
+        if prefetcher:
+            active_sessions[session_id]["prefetch"] = prefetcher
+
+        # Units discussed in this session; changes to them are pushed as unit_update
+        if config.UNIT_UPDATES_ENABLED:
+            unit_watch = UNIT_CHANGES.subscribe(project_id, max_units=config.UNIT_WATCH_MAX)
+            active_sessions[session_id]["unit_updates"] = unit_watch
+
+        catalog_sync = None
+        if catalog and config.CATALOG_SYNC_ENABLED:
+            catalog_sync = CatalogSync(
+                project_id, client_version=catalog if isinstance(catalog, str) else None
+            )
+            active_sessions[session_id]["catalog"] = catalog_sync
+
+        async def send_catalog(message: Dict[str, Any] | None):
+            if message:
+                await outbound_queue.put("unit_catalog", message, SendPriority.CONTROL)
+
+        async def forward_tool_response(data: Dict[str, Any]):
+            """Sends a tool response, as catalog references once the client's catalog is current"""
+            if catalog_sync:
+                await send_catalog(
+                    catalog_sync.update(await asyncio.to_thread(get_snapshot, project_id))
+                )
+                data = catalog_sync.reference_units(data)
+            await outbound_queue.put("tool_call_response", data, SendPriority.CONTROL)
+
+        async def forward_audio(data):
+            pcm = AudioCodec.decode_pcm(data)
+            if greeting_recorder:
+                greeting_recorder.add_audio(pcm)
+            await audio_aggregator.push(pcm)
+
+        async def forward_output_transcription(data: str):
+            if greeting_recorder:
+                greeting_recorder.add_transcript(data)
+            await transcript_aggregator.push("output_transcription-delta", data)
+
+        async def forward_input_transcription(data: str):
+            if greeting_recorder:
+                # The caller spoke, so the turn may answer them: not a greeting
+                greeting_recorder.abandon()
+            if prefetcher:
+                prefetcher.observe(data)
+            await transcript_aggregator.push("input_transcription-delta", data)
+
+        # Coalesce one- or two-character transcription deltas into word-level deltas
+        transcript_aggregator = TranscriptAggregator(
+            send=lambda type_, text: outbound_queue.put(
+                type_, text, SendPriority.TRANSCRIPT
+            ),
+            window_ms=config.TRANSCRIPT_WINDOW_MS,
+            max_words=config.TRANSCRIPT_MAX_WORDS,
+            max_hold_ms=config.TRANSCRIPT_MAX_HOLD_MS,
+        )
+        active_sessions[session_id]["transcripts"] = transcript_aggregator
+
+        async def interrupt_playback(metadata: Dict[str, Any]):
+            """Fast path on barge-in: drop the interrupted turn's audio, notify first"""
+            generation = metadata.get("generation", 0)
+            audio_aggregator.discard()
+            await transcript_aggregator.flush()
+            await outbound_queue.interrupt(
+                "interruption",
+                {"interrupted": True, "generation": generation},
+                generation=generation,
+                received_at=metadata.get("received_at"),
+            )
+
+        # Message type handlers
+        handle_message_type = {
+            MessageType.TEXT: lambda data: outbound_queue.put(
+                "text-delta", data, SendPriority.TRANSCRIPT
+            ),
+            MessageType.INPUT_TRANSCRIPTION: forward_input_transcription,
+            MessageType.OUTPUT_TRANSCRIPTION: forward_output_transcription,
+            MessageType.AUDIO: forward_audio,
+            MessageType.TOOL_CALL_RESPONSE: forward_tool_response,
+        }
+
+        # A cached greeting for this persona is played while the Live session connects;
+        # without one, the model is asked to greet and that reply is recorded
+        greeting = None
+        greeting_recorder = None
+        if greeting_cache and not text_only:
+            greeting_key = GreetingCache.key(voice_name, dialect, language, agent_name)
+            greeting = await asyncio.to_thread(greeting_cache.get, greeting_key)
+            if greeting is None:
+                greeting_recorder = GreetingRecorder(response_tool=finalize_response.__name__)
+
+        async def store_greeting():
+            recorded = greeting_recorder.finish()
+            if recorded:
+                audio, transcript, response = recorded
+                persona = {
+                    "voice": voice_name,
+                    "dialect": dialect,
+                    "language": language,
+                    "agent_name": agent_name,
+                }
+                await asyncio.to_thread(
+                    greeting_cache.put, greeting_key, audio, transcript, response, persona
+                )
+
+        await ws.send_json(
+            {
+                "type": "connected",
+                "data": {
                     "session_id": session_id,
-                    "timestamp": datetime.now().isoformat(),
+                    "mode": "text" if text_only else "audio",
+                    "audio_output": None if text_only else audio_encoder.describe(),
+                    "compression": compressor.describe() if compressor else None,
+                    # Message timestamps are milliseconds since this instant
+                    "started_at": envelope.started_at,
+                    "cached_greeting": greeting is not None,
+                },
+            }
+        )
+        if greeting:
+            if greeting.response:
+                # What a live greeting's `finalize_response` call would have sent
+                await outbound_queue.put(
+                    "tool_call_response", greeting.response, SendPriority.CONTROL
+                )
+            # Few large frames, so a long greeting cannot overflow the outbound queue
+            frame_bytes = config.GREETING_FRAME_MS * BYTES_PER_SECOND // 1000 // 2 * 2
+            for start in range(0, len(greeting.audio), frame_bytes):
+                await send_audio_frame(greeting.audio[start : start + frame_bytes])
+            await outbound_queue.put(
+                "output_transcription-delta", greeting.transcript, SendPriority.TRANSCRIPT
+            )
+
+        # Improved VAD settings for better interruption handling
+        vad_settings = {
+            "VAD_START_SENSITIVITY": "high",
+            "VAD_END_SENSITIVITY": "low",
+            "VAD_SILENCE_DURATION_MS": 1000,
+            "VAD_PREFIX_PADDING_MS": 300,
+        }
+
+        # Initialize Live Agent; the writer starts first and sends any queued greeting
+        # while the Live session connects
+        async with cancel_on_exit(
+            asyncio.create_task(outbound_queue.run())
+        ) as writer_task, LiveAgent(
+            config={
+                    "API_KEY": config.GOOGLE_API_KEY,
+                    "ENABLE_TRANSCRIPTION": not text_only,
+                    "RESPONSE_MODALITY": "text" if text_only else "audio",
+                    "MODEL": config.LIVEAPI_MODEL,
+                    "SYSTEM_PROMPT": custom_agent_prompt(
+                        project_id=project_id,
+                        agent_name=agent_name,
+                        agent_gender=agent_gender,
+                        dialect=dialect,
+                        language=language,
+                        variant=config.PROMPT_VARIANT,
+                    ),
+                    "VOICE_NAME": voice_name,
+                    "DIALECT": dialect,
+                    **vad_settings,
+                },
+                tools=tools,
+        ) as live_agent:
+
+            if greeting:
+                # The model continues the conversation the caller has already heard
+                await live_agent.send_context(greeting.transcript)
+            elif greeting_recorder:
+                await live_agent.send_text(GREETING_INSTRUCTION)
+
+            # Optionally forward only speech (plus padding) upstream
+            silence_gate = None
+            if config.SILENCE_GATE_ENABLED and not text_only:
+                silence_gate = SilenceGate.from_vad_config(
+                    send_audio=live_agent.send_audio,
+                    send_stream_end=live_agent.send_audio_stream_end,
+                    vad_config=vad_settings,
+                    keepalive_ms=config.SILENCE_GATE_KEEPALIVE_MS,
+                )
+                active_sessions[session_id]["silence_gate"] = silence_gate
+
+            # Downmix and resample whatever the client captures to 16 kHz mono PCM
+            audio_normalizer = PcmNormalizer(
+                sample_rate=input_sample_rate, channels=input_channels
+            )
+
+            async def normalize_audio(chunk: bytes) -> bytes:
+                if dsp and (input_sample_rate != 16000 or input_channels != 1):
+                    return await dsp.process("normalize", chunk)
+                return audio_normalizer.to_pcm(chunk)
+
+            # Batch small client microphone chunks before each send_realtime_input
+            inbound_aggregator = AudioFrameAggregator(
+                send=silence_gate.process if silence_gate else live_agent.send_audio,
+                frame_ms=config.AUDIO_IN_FRAME_MS,
+                max_delay_ms=config.AUDIO_IN_MAX_DELAY_MS,
+                sample_rate=16000,
+            )
+            active_sessions[session_id]["audio_in"] = inbound_aggregator
+
+            async def receive_messages():
+                """Handle incoming WebSocket messages from client"""
+                while ws.client_state in [
+                    WebSocketState.CONNECTED,
+                    WebSocketState.CONNECTING,
+                ]:
+                    raw_data = await ws.receive_text()
+                    data = ClientData.model_validate_json(raw_data)
+
+                    if data.catalog_sync and catalog_sync:
+                        await send_catalog(
+                            catalog_sync.request(
+                                await asyncio.to_thread(get_snapshot, project_id),
+                                data.catalog_version,
+                            )
+                        )
+
+                    if data.text:
+                        logger.info(f"Received text: {data.text[:50]}...")
+                        if greeting_recorder:
+                            greeting_recorder.abandon()
+                        if prefetcher:
+                            prefetcher.observe(data.text + "\n")
+                        await live_agent.send_text(data.text)
+
+                    if data.audio and text_only:
+                        log_sampled(
+                            logger,
+                            logging.DEBUG,
+                            "audio_ignored",
+                            "Ignoring audio chunk in text-only session",
+                        )
+                    elif data.audio:
+                        log_sampled(logger, logging.DEBUG, "audio_in", "Received audio chunk")
+                        await inbound_aggregator.push(
+                            await normalize_audio(base64.b64decode(data.audio))
+                        )
+
+                    if data.audio_stream_end and not text_only:
+                        logger.info("Audio stream ended")
+                        await inbound_aggregator.flush()
+                        if silence_gate:
+                            silence_gate.reset()
+                        await live_agent.send_audio_stream_end()
+
+            async def send_messages():
+                """Handle outgoing messages from Live API to client"""
+                if catalog_sync:
+                    await send_catalog(
+                        catalog_sync.update(await asyncio.to_thread(get_snapshot, project_id))
+                    )
+
+                while ws.client_state in [
+                    WebSocketState.CONNECTED,
+                    WebSocketState.CONNECTING,
+                ]:
+                    async for message in live_agent.receive_message():
+                        if message.type == MessageType.INTERRUPTION:
+                            if greeting_recorder:
+                                greeting_recorder.abandon()
+                            await interrupt_playback(message.metadata or {})
+                            continue
+                        if message.type == MessageType.TURN_COMPLETE:
+                            await audio_aggregator.flush()
+                            await transcript_aggregator.flush()
+                            log_context.turn += 1
+                            if prefetcher:
+                                prefetcher.end_turn()
+                            if greeting_recorder and greeting_recorder.active:
+                                await store_greeting()
+                            continue
+                        if message.type == MessageType.OUTPUT_TRANSCRIPTION:
+                            # The model is answering, so the user's words are final
+                            await transcript_aggregator.flush("input_transcription-delta")
+                        if message.type == MessageType.TOOL_CALL_RESPONSE and greeting_recorder:
+                            greeting_recorder.add_tool_response(
+                                (message.metadata or {}).get("name"), message.data
+                            )
+                        if message.type == MessageType.TOOL_CALL_RESPONSE and unit_watch:
+                            unit_watch.watch(referenced_codes(message.data))
+                            if unit_code := (message.metadata or {}).get("unit_code"):
+                                unit_watch.watch(resolve_codes(project_id, [unit_code]))
+                        if handler := handle_message_type.get(message.type):
+                            await handler(message.data)
+
+            async def forward_unit_updates():
+                """Push changes to discussed units to the client, and optionally the model"""
+                async for update in unit_watch:
+                    await outbound_queue.put("unit_update", update, SendPriority.CONTROL)
+                    if config.UNIT_UPDATES_TO_MODEL:
+                        await live_agent.send_context(describe_update(update), role="user")
+
+            tasks = [
+                asyncio.create_task(receive_messages()),
+                asyncio.create_task(send_messages()),
+                writer_task,
+            ]
+            if unit_watch:
+                tasks.append(asyncio.create_task(forward_unit_updates()))
+
+            try:
+                await asyncio.gather(
+                    *tasks,
+                )
+            except WebSocketDisconnect:
+                pass
+            except Exception as e:
+                logger.error(f"Error in WebSocket handler: {e}")
+            finally:
+                if ws.client_state == WebSocketState.CONNECTED:
+                    await ws.close()
+                for task in tasks:
+                    task.cancel()
+                audio_aggregator.discard()
+                inbound_aggregator.discard()
+                transcript_aggregator.discard()
+                await live_agent._session.close()
+    finally:
+        # Also runs when the Live connect fails or the client drops during setup
+        if unit_watch:
+            unit_watch.close()
+        if dsp:
+            dsp.close()
+        logger.info(
+            f"Session {session_id} stats: "
+            + json.dumps(
+                {
+                    name: component.stats()
+                    for name, component in active_sessions.pop(session_id, {}).items()
                 }
             )
-            logger.debug(f"Sent {type_} to client")
+        )
 
-        except Exception as e:
-            logger.error(f"Failed to send {type_} message: {e}")
 
-    # Message type handlers
-    handle_message_type = {
-        MessageType.TEXT: lambda data: send_json_streaming("text-delta", data),
-        MessageType.INPUT_TRANSCRIPTION: lambda data: send_json_streaming(
-            "input_transcription-delta", data
-        ),
-        MessageType.OUTPUT_TRANSCRIPTION: lambda data: send_json_streaming(
-            "output_transcription-delta", data
-        ),
-        MessageType.AUDIO: lambda data: send_json_streaming(
-            "audio-delta", AudioCodec.to_wav(data)
-        ),
-        MessageType.INTERRUPTION: lambda data: send_json_streaming(
-            "interruption", {"interrupted": data}
-        ),
-        MessageType.TOOL_CALL_RESPONSE: lambda data: send_json_streaming(
-            "tool_call_response", data
-        ),
+@app.get("/stats")
+def session_stats():
+    """Streaming statistics for every active session"""
+    return {
+        session_id: {name: component.stats() for name, component in components.items()}
+        for session_id, components in active_sessions.items()
     }
 
-    # Initialize Live Agent
-    async with LiveAgent(
-        config={
-                "API_KEY": config.GOOGLE_API_KEY,
-                "ENABLE_TRANSCRIPTION": True,
-                "MODEL": config.LIVEAPI_MODEL,
-                "SYSTEM_PROMPT": custom_agent_prompt(
-                    project_id="ehya-marina",
-                    agent_name=agent_name,
-                    agent_gender=agent_gender,
-                    dialect=dialect,
-                    language=language
-                ),
-                "VOICE_NAME": voice_name,
-                "DIALECT": dialect,
-                # Improved VAD settings for better interruption handling
-                "VAD_START_SENSITIVITY": "high",
-                "VAD_END_SENSITIVITY": "low", 
-                "VAD_SILENCE_DURATION_MS": 1000,
-                "VAD_PREFIX_PADDING_MS": 300,
-            },
-            tools=tools,
-    ) as live_agent:
-
-        async def receive_messages():
-            """Handle incoming WebSocket messages from client"""
-            while ws.client_state in [
-                WebSocketState.CONNECTED,
-                WebSocketState.CONNECTING,
-            ]:
-                raw_data = await ws.receive_text()
-                data = ClientData.model_validate_json(raw_data)
-
-                if data.text:
-                    logger.info(f"Received text: {data.text[:50]}...")
-                    await live_agent.send_text(data.text)
-
-                if data.audio:
-                    logger.info("Received audio chunk")
-                    await live_agent.send_audio(base64.b64decode(data.audio))
-
-                if data.audio_stream_end:
-                    logger.info("Audio stream ended")
-                    await live_agent.send_audio_stream_end()
-
-        async def send_messages():
-            """Handle outgoing messages from Live API to client"""
-            await ws.send_json(
-                {"type": "connected", "data": {"session_id": session_id}}
-            )
 
-            while ws.client_state in [
-                WebSocketState.CONNECTED,
-                WebSocketState.CONNECTING,
-            ]:
-                async for message in live_agent.receive_message():
-                    if handler := handle_message_type.get(message.type):
-                        await asyncio.wait_for(handler(message.data), timeout=30.0)
-
-        tasks = [
-            asyncio.create_task(receive_messages()),
-            asyncio.create_task(send_messages()),
+@app.get("/stats/dsp")
+def dsp_stats():
+    """Audio DSP worker pool statistics"""
+    return dsp_executor.stats() if dsp_executor else {}
+
+
+@app.get("/stats/prompts")
+def system_prompt_stats():
+    """System prompt build time and size per persona variant"""
+    return prompt_stats()
+
+
+@app.get("/stats/prompts/tokens")
+def system_prompt_tokens(
+    agent_name: str = "Sara",
+    agent_gender: str = "female",
+    dialect: str = "Saudi",
+    language: str = "ar",
+):
+    """System prompt token counts by section, for each prompt variant"""
+    return analyze_prompt_budget(
+        [
+            {
+                "agent_name": agent_name,
+                "agent_gender": agent_gender,
+                "dialect": dialect,
+                "language": language,
+            }
         ]
+    )
 
-        try:
-            await asyncio.gather(
-                *tasks,
-            )
-        except WebSocketDisconnect:
-            pass
-        except Exception as e:
-            logger.error(f"Error in WebSocket handler: {e}")
-        finally:
-            if ws.client_state == WebSocketState.CONNECTED:
-                await ws.close()
-            for task in tasks:
-                task.cancel()
-            await live_agent._session.close()
+
+@app.get("/stats/tools/projection")
+def tool_projection_stats():
+    """Tokens saved by projecting unit fields in tool responses"""
+    return projection_stats()
+
+
+@app.get("/stats/greetings")
+def greeting_cache_stats():
+    """Greeting cache hits, stores and evictions since startup"""
+    return greeting_cache.stats() if greeting_cache else {}
+
+
+@app.get("/stats/units/changes")
+def unit_change_stats():
+    """Unit change detection and session notification counters"""
+    return UNIT_CHANGES.stats()
 
 
 @app.get("/invlidate-cache")
@@ -218,4 +697,5 @@ if __name__ == "__main__":
         logger.warning("No units found.")
 
     logger.info("Starting FastAPI server...")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # log_config=None lets uvicorn's loggers propagate to the queued root handler
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=None)
\ No newline at end of file
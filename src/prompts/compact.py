@@ -0,0 +1,86 @@
+"""
+Compact, prompt-friendly serialization of knowledge-base structures.
+
+`str(dict)` spends tokens on quotes, braces, commas and snake_case keys and repeats
+identical list items verbatim. `compact_serialize` renders the same content as
+indented `key: value` lines instead:
+
+    villa name: Fog Villa A
+    floors:
+    - floor name: Ground Floor
+      features: Car garage, Outdoor courtyard x2, Kitchen
+"""
+
+from collections import Counter
+
+
+def _scalar(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _is_scalar(value) -> bool:
+    return not isinstance(value, (dict, list, tuple, set))
+
+
+def _key(key) -> str:
+    return str(key).replace("_", " ")
+
+
+def _is_inline(items) -> bool:
+    """Short scalars (names, room labels) share a line; sentences get one line each"""
+    return all(_is_scalar(item) and len(_scalar(item)) <= 60 for item in items)
+
+
+def _inline_list(items) -> str:
+    """Scalars joined by commas, repeated items collapsed as `item xN` at first use"""
+    counts = Counter(_scalar(item) for item in items)
+    seen = set()
+    out = []
+    for item in items:
+        text = _scalar(item)
+        if text in seen:
+            continue
+        seen.add(text)
+        out.append(f"{text} x{counts[text]}" if counts[text] > 1 else text)
+    return ", ".join(out)
+
+
+def _lines(value, indent: str) -> list[str]:
+    if isinstance(value, dict):
+        # {"name": ..., "description": ...} entries read naturally as "name: description"
+        if set(value) == {"name", "description"} and _is_scalar(value["description"]):
+            return [f"{indent}{_scalar(value['name'])}: {_scalar(value['description'])}"]
+        lines = []
+        for key, item in value.items():
+            if _is_scalar(item):
+                lines.append(f"{indent}{_key(key)}: {_scalar(item)}")
+            elif isinstance(item, dict) and len(item) == 1 and _is_scalar(
+                next(iter(item.values()))
+            ):
+                # {"Balconies": {"description": ...}} -> "Balconies: ..."
+                lines.append(f"{indent}{_key(key)}: {_scalar(next(iter(item.values())))}")
+            elif isinstance(item, (list, tuple, set)) and _is_inline(item):
+                lines.append(f"{indent}{_key(key)}: {_inline_list(list(item))}")
+            else:
+                lines.append(f"{indent}{_key(key)}:")
+                lines.extend(_lines(item, indent + "  "))
+        return lines
+
+    if isinstance(value, (list, tuple, set)):
+        if _is_inline(value):
+            return [f"{indent}{_inline_list(list(value))}"]
+        lines = []
+        for item in value:
+            item_lines = _lines(item, indent + "  ")
+            # First line of each item carries the "- " marker in place of its indent
+            item_lines[0] = f"{indent}- {item_lines[0][len(indent) + 2:]}"
+            lines.extend(item_lines)
+        return lines
+
+    return [f"{indent}{line}" for line in _scalar(value).strip().splitlines()]
+
+
+def compact_serialize(value) -> str:
+    return "\n".join(_lines(value, ""))
@@ -1,3 +1,13 @@
+import functools
+import logging
+import string
+import time
+from enum import StrEnum
+
+from prompts.compact import compact_serialize
+
+logger = logging.getLogger(__name__)
+
 
 # ------------------------------------------------------------------
 # 1. Project Knowledge Base
@@ -368,22 +378,7 @@ PROJECT_FEATURES = {
 # 2. Agent Prompt Template - Organized and Structured
 # ------------------------------------------------------------------
 
-def custom_agent_prompt(project_id: str, agent_name: str, agent_gender: str, dialect: str, language: str) -> str:
-    """
-    Live API System Prompt Configuration for VOOM Real Estate Assistant
-
-    This module provides a unified system prompt template that prevents the Live API
-    from generating duplicate responses while ensuring proper dialect handling and
-    speech characteristics for the ehya-marina real estate project.
-
-    Key Features:
-    - Single template for all dialects (Arabic: Saudi/Egyptian, English).
-    - Strict tool-only response policy to prevent response duplication.
-    - Optimized speech pace and tone instructions for natural TTS delivery.
-    - Flexible dialect mapping with fallback handling.
-    """
-    
-    AGENT_PROMPT_TEMPLATE = """
+AGENT_PROMPT_TEMPLATE = """
 ═══════════════════════════════════════════════════════════════════════════════
 REAL ESTATE AI AGENT - SYSTEM INSTRUCTIONS
 ═══════════════════════════════════════════════════════════════════════════════
@@ -609,6 +604,8 @@ For SAUDI and EGYPTIAN dialects, NEVER pronounce digits as numbers:
 - **Follow-up Refinements:** Add new filters to existing criteria
 - **Approximate Matching:** Use `price`/`sellable_area` with tolerance
 - **Random Selection:** Add `pick_random: true` for vague requests
+- **Cheapest / Largest:** Use `sort_by` with `order` and a small `limit` (e.g. `sort_by: "price", limit: 1`) instead of fetching everything
+- **Show More:** Repeat the same call with `cursor` set to the previous `next_cursor`
 
 **Enhanced Filter Options:**
 - `price`: Approximate price matching
@@ -619,8 +616,22 @@ For SAUDI and EGYPTIAN dialects, NEVER pronounce digits as numbers:
 - `price_tolerance`: Custom tolerance (0.05 = 5%)
 - `area_tolerance`: Custom tolerance (0.05 = 5%)
 - Standard filters: `unit_code`, `unit_type`, `building`, `floor`, `availability`
-
-#### 2. `save_lead` - Lead Capture Tool
+- `sort_by` ("price", "sellable_area", "unit_area", "floor") & `order` ("asc"/"desc"), `limit` (default 10), `cursor`
+- `fields`: Unit fields to return; defaults to a lean set (code, type, area, price, availability, building, floor). Use `["all"]` only when the user needs every detail
+- `shape: "columns"`: Header plus rows, for long lists
+
+#### 2. `get_unit_statistics` - Inventory Counts & Ranges
+**Use for how-many / which-kinds / what-range questions, in ONE call:**
+- "How many 2-bedroom units are left and what's the price range?" / "كم شقة غرفتين متبقية وكم أسعارها؟"
+- "Which buildings still have available units?" / "أي المباني فيها وحدات متاحة؟"
+- Filters: `unit_type`, `building`, `floor`, `availability`; group with `group_by`
+
+#### 3. `find_similar_units` - Alternatives to a Unit
+**Use when a unit the user likes is reserved or unlaunched, or they ask for "something like this":**
+- "3-Q is taken? Anything similar?" / "الوحدة محجوزة؟ فيه شي مشابه؟"
+- ONE call with `unit_code` (and `k`, default 3) instead of guessing filters across several searches
+
+#### 4. `save_lead` - Lead Capture Tool
 **Use when detecting interest signals:**
 - English: "this is great", "I'm very interested", "how can I book it?"
 - Arabic: "هذا جميل", "معجب بالوحدة", "كيف أحجز؟"
@@ -630,7 +641,7 @@ For SAUDI and EGYPTIAN dialects, NEVER pronounce digits as numbers:
 2. Collect name and phone number
 3. Use tool to store information with context notes
 
-#### 3. `finalize_response` - Response Formatter
+#### 5. `finalize_response` - Response Formatter
 **Structure:**
 ```json
 {{
@@ -814,11 +825,12 @@ User: "Just pick one for me"
 **Project Details:** {project_description}
 **Location Details:** {location_descriptions}
 
-**Unit Descriptions:**
-- 1 Bedroom: {unit_one_description}
-- 2 Bedrooms: {unit_two_description}
-- 2.5 Bedrooms: {unit_two_half_description}
-- 3.5 Bedrooms: {unit_three_description}
+**Villa Layouts:**
+- Fog Villa A: {villa_fog_a_description}
+- Scarf Villa B: {villa_scarf_b_description}
+- Crystal Villa C: {villa_crystal_c_description}
+- Rock Villa D: {villa_rock_d_description}
+- Valley Villa E: {villa_valley_e_description}
 
 **Master Plan:** {master_plan_details}
 **Key Features:** {project_features}
@@ -837,24 +849,217 @@ User: "Just pick one for me"
 - **Rephrasing:** Always rephrase the responseText into a coherent, engaging message. Rephrase project descriptions and details each time you present them so they feel natural and compelling.
 ═══════════════════════════════════════════════════════════════════════════════
     """
-    
-    # Format the template with provided parameters
-    return AGENT_PROMPT_TEMPLATE.format(
-        project_description=str(EHYA_MARINA_PROJECT_DESCRIPTION),
-        unit_one_description=Unit_ONE_Description,
-        unit_two_description=Unit_TWO_Description,
-        unit_two_half_description=Unit_TWO_HALF_Description,
-        unit_three_description=Unit_THREE_HALF_Description,
-        tour_locations=str(Tour_Locations),
-        tour_locations_descriptions=str(Tour_Locations_Descriptions),
-        master_plan_details=MASTER_PLAN_DETAILS,
-        project_features=PROJECT_FEATURES,
-        building_description=BUILDING_DESCRIPTION,
-        dialect=dialect,
-        language=language,
+
+
+# ------------------------------------------------------------------
+# 3. Precompiled Prompt & Persona Cache
+# ------------------------------------------------------------------
+
+# Knowledge-base structures by template field
+KNOWLEDGE_BASE = {
+    "project_description": EHYA_MARINA_PROJECT_DESCRIPTION,
+    "villa_fog_a_description": VILLA_FOG_A_Description,
+    "villa_scarf_b_description": Villa_Scarf_B_Description,
+    "villa_crystal_c_description": VILLA_Crystal_C_Description,
+    "villa_rock_d_description": VILLA_Rock_D_Description,
+    "villa_valley_e_description": VILLA_Valley_E_Description,
+    "tour_locations": Tour_Locations,
+    "tour_locations_descriptions": Tour_Locations_Descriptions,
+    "master_plan_details": MASTER_PLAN_DETAILS,
+    "project_features": PROJECT_FEATURES,
+    "building_description": BUILDING_DESCRIPTION,
+    "locations": Locations_List,
+    "location_descriptions": Locations_Descriptions,
+}
+
+# Knowledge-base sections, serialized once at import
+KNOWLEDGE_BASE_SECTIONS = {field: str(value) for field, value in KNOWLEDGE_BASE.items()}
+# The same content without quotes, braces and repeated items (see `prompts.compact`)
+COMPACT_KNOWLEDGE_BASE_SECTIONS = {
+    field: compact_serialize(value) for field, value in KNOWLEDGE_BASE.items()
+}
+
+# Knowledge served on demand by the `get_project_info` tool, by section and key
+PROJECT_INFO_SECTIONS = {
+    "project": EHYA_MARINA_PROJECT_DESCRIPTION,
+    "locations": {
+        location["name"]: location["description"]
+        for location in Locations_Descriptions["locations"]
+    },
+    "villas": {
+        villa["villa_name"]: villa
+        for villa in (
+            VILLA_FOG_A_Description,
+            Villa_Scarf_B_Description,
+            VILLA_Crystal_C_Description,
+            VILLA_Rock_D_Description,
+            VILLA_Valley_E_Description,
+        )
+    },
+    "tour": Tour_Locations_Descriptions,
+    "master_plan": MASTER_PLAN_DETAILS,
+    "features": {name: feature["description"] for name, feature in PROJECT_FEATURES.items()},
+    "building": BUILDING_DESCRIPTION,
+}
+
+
+def _project_info_reference(section: str, key: str | None = None) -> str:
+    """How the slim prompt points the model at a knowledge section"""
+    if key is not None:
+        return f'get_project_info(section="{section}", key="{key}")'
+    content = PROJECT_INFO_SECTIONS[section]
+    if section != "project" and isinstance(content, dict):
+        return f'get_project_info(section="{section}"), optionally with one key of: {", ".join(content)}'
+    return f'get_project_info(section="{section}")'
+
+
+# The slim prompt carries only references to `get_project_info`; tour location names
+# stay inline since navigation actions need them verbatim
+SLIM_KNOWLEDGE_BASE_SECTIONS = {
+    "project_description": _project_info_reference("project"),
+    "villa_fog_a_description": _project_info_reference("villas", "Fog Villa A"),
+    "villa_scarf_b_description": _project_info_reference("villas", "Scarf Villa B"),
+    "villa_crystal_c_description": _project_info_reference("villas", "Crystal Villa C"),
+    "villa_rock_d_description": _project_info_reference("villas", "Rock Villa D"),
+    "villa_valley_e_description": _project_info_reference("villas", "Valley Villa E"),
+    "tour_locations": str(Tour_Locations),
+    "tour_locations_descriptions": _project_info_reference("tour"),
+    "master_plan_details": _project_info_reference("master_plan"),
+    "project_features": _project_info_reference("features"),
+    "building_description": _project_info_reference("building"),
+    "locations": _project_info_reference("locations"),
+    "location_descriptions": _project_info_reference("locations"),
+}
+
+
+class PromptVariant(StrEnum):
+    FULL = "full"  # knowledge base inlined as Python dict dumps (the original prompt)
+    COMPACT = "compact"  # knowledge base inlined once, compactly serialized
+    SLIM = "slim"  # knowledge base fetched on demand through `get_project_info`
+
+
+# Sent as the first user turn of a session whose greeting is being recorded for the
+# greeting cache, so the recorded turn holds nothing a caller said
+GREETING_INSTRUCTION = (
+    "The caller has just connected and has not said anything yet. "
+    "Greet them now, following the opening sequence."
+)
+
+# Fields that vary per session
+PERSONA_FIELDS = ("project_id", "agent_name", "agent_gender", "dialect", "language")
+
+
+def compile_template(
+    template: str, sections: dict[str, str], reference_repeats: bool = False
+) -> list[str | tuple[str]]:
+    """
+    Split a `str.format` template into literal text, with `sections` already substituted,
+    and `(field,)` placeholders for the persona fields, merging adjacent literals.
+
+    With `reference_repeats`, a section used several times is inlined only at its last
+    use (the knowledge-base block) and earlier uses refer to it by name.
+    """
+    parsed = list(string.Formatter().parse(template))
+    last_use = {field: i for i, (_, field, _, _) in enumerate(parsed) if field}
+
+    parts: list[str | tuple[str]] = []
+    for i, (literal, field, spec, conversion) in enumerate(parsed):
+        parts.append(literal)
+        if field is None:
+            continue
+        if spec or conversion:
+            raise ValueError(f"Unsupported format spec in prompt field {{{field}}}")
+        if field in sections and reference_repeats and i != last_use[field]:
+            parts.append(f"the {field.replace('_', ' ')} in the knowledge base below")
+        elif field in sections:
+            parts.append(sections[field])
+        elif field in PERSONA_FIELDS:
+            parts.append((field,))
+        else:
+            raise KeyError(f"Unknown prompt field: {field}")
+
+    compiled: list[str | tuple[str]] = []
+    for part in parts:
+        if isinstance(part, str) and compiled and isinstance(compiled[-1], str):
+            compiled[-1] += part
+        elif part != "":
+            compiled.append(part)
+    return compiled
+
+
+_started = time.perf_counter()
+COMPILED_AGENT_PROMPTS = {
+    PromptVariant.FULL: compile_template(AGENT_PROMPT_TEMPLATE, KNOWLEDGE_BASE_SECTIONS),
+    PromptVariant.COMPACT: compile_template(
+        AGENT_PROMPT_TEMPLATE, COMPACT_KNOWLEDGE_BASE_SECTIONS, reference_repeats=True
+    ),
+    PromptVariant.SLIM: compile_template(
+        AGENT_PROMPT_TEMPLATE, SLIM_KNOWLEDGE_BASE_SECTIONS, reference_repeats=True
+    ),
+}
+KNOWLEDGE_BASE_BUILD_MS = round(1000 * (time.perf_counter() - _started), 3)
+
+# Builds, size and build time per variant. Keyed by the closed `PromptVariant` set
+# only: persona fields come from clients and would grow this without bound.
+PROMPT_VARIANT_STATS: dict[str, dict] = {
+    variant: {"builds": 0, "chars": 0, "bytes": 0, "build_ms": 0.0} for variant in PromptVariant
+}
+
+
+def render_prompt(compiled: list[str | tuple[str]], **persona) -> str:
+    return "".join(
+        part if isinstance(part, str) else str(persona[part[0]]) for part in compiled
+    )
+
+
+# A render takes well under a millisecond, so only a few hot personas are kept; each
+# entry holds a full prompt of some tens of KB
+@functools.lru_cache(maxsize=8)
+def custom_agent_prompt(project_id: str, agent_name: str, agent_gender: str, dialect: str, language: str, variant: str = PromptVariant.FULL) -> str:
+    """
+    Live API System Prompt Configuration for VOOM Real Estate Assistant
+
+    This module provides a unified system prompt template that prevents the Live API
+    from generating duplicate responses while ensuring proper dialect handling and
+    speech characteristics for the ehya-marina real estate project.
+
+    Key Features:
+    - Single template for all dialects (Arabic: Saudi/Egyptian, English).
+    - Strict tool-only response policy to prevent response duplication.
+    - Optimized speech pace and tone instructions for natural TTS delivery.
+    - Flexible dialect mapping with fallback handling.
+    - `variant` selects how the knowledge base is included (see `PromptVariant`).
+    """
+    variant = PromptVariant(variant)
+    started = time.perf_counter()
+    prompt = render_prompt(
+        COMPILED_AGENT_PROMPTS[variant],
+        project_id=project_id,
         agent_name=agent_name,
         agent_gender=agent_gender,
-        project_id=project_id,
-        locations=str(Locations_List),
-        location_descriptions=str(Locations_Descriptions)
+        dialect=dialect,
+        language=language,
     )
+    build_ms = round(1000 * (time.perf_counter() - started), 3)
+
+    stats = PROMPT_VARIANT_STATS[variant]
+    stats["builds"] += 1
+    stats["chars"] = len(prompt)
+    stats["bytes"] = len(prompt.encode("utf-8"))
+    stats["build_ms"] = build_ms
+    logger.info(f"Built system prompt variant {variant}: {len(prompt)} chars in {build_ms} ms")
+    return prompt
+
+
+def prompt_stats() -> dict:
+    """Knowledge-base build time, persona cache counters and per-variant prompt size"""
+    cache = custom_agent_prompt.cache_info()
+    return {
+        "knowledge_base_build_ms": KNOWLEDGE_BASE_BUILD_MS,
+        "knowledge_base_chars": sum(len(v) for v in KNOWLEDGE_BASE_SECTIONS.values()),
+        "compact_knowledge_base_chars": sum(
+            len(v) for v in COMPACT_KNOWLEDGE_BASE_SECTIONS.values()
+        ),
+        "cache": {"hits": cache.hits, "misses": cache.misses, "size": cache.currsize},
+        "variants": PROMPT_VARIANT_STATS,
+    }
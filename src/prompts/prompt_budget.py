@@ -0,0 +1,121 @@
+"""
+Token budget of the system prompt, by section and variant.
+
+Counts use a tiktoken encoding as a proxy for the Live API tokenizer: absolute numbers
+differ somewhat, but the relative weight of sections and the savings of the compact
+and slim variants carry over.
+
+    python -m prompts.prompt_budget --dialect Saudi --language ar
+"""
+
+import argparse
+import functools
+import json
+import string
+
+import tiktoken
+
+from prompts.live_prompt import (
+    AGENT_PROMPT_TEMPLATE,
+    COMPACT_KNOWLEDGE_BASE_SECTIONS,
+    KNOWLEDGE_BASE_SECTIONS,
+    SLIM_KNOWLEDGE_BASE_SECTIONS,
+    PromptVariant,
+    custom_agent_prompt,
+)
+
+DEFAULT_ENCODING = "o200k_base"
+
+VARIANT_SECTIONS = {
+    PromptVariant.FULL: KNOWLEDGE_BASE_SECTIONS,
+    PromptVariant.COMPACT: COMPACT_KNOWLEDGE_BASE_SECTIONS,
+    PromptVariant.SLIM: SLIM_KNOWLEDGE_BASE_SECTIONS,
+}
+
+DEFAULT_PERSONA = {
+    "project_id": "ehya-marina",
+    "agent_name": "Sara",
+    "agent_gender": "female",
+    "dialect": "Saudi",
+    "language": "ar",
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _encoding(name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(text: str, encoding: str = DEFAULT_ENCODING) -> int:
+    return len(_encoding(encoding).encode(text))
+
+
+def _template_uses() -> dict[str, int]:
+    uses: dict[str, int] = {}
+    for _, field, _, _ in string.Formatter().parse(AGENT_PROMPT_TEMPLATE):
+        if field in KNOWLEDGE_BASE_SECTIONS:
+            uses[field] = uses.get(field, 0) + 1
+    return uses
+
+
+def section_breakdown(
+    variant: str = PromptVariant.FULL, encoding: str = DEFAULT_ENCODING
+) -> dict:
+    """Tokens of each knowledge-base section and how many copies the prompt carries"""
+    variant = PromptVariant(variant)
+    sections = VARIANT_SECTIONS[variant]
+    breakdown = {}
+    for field, uses in _template_uses().items():
+        tokens = count_tokens(sections[field], encoding)
+        # Compact and slim prompts inline each section once and refer to it elsewhere
+        copies = uses if variant == PromptVariant.FULL else 1
+        breakdown[field] = {
+            "uses": uses,
+            "tokens_each": tokens,
+            "tokens_total": tokens * copies,
+        }
+    return dict(sorted(breakdown.items(), key=lambda kv: -kv[1]["tokens_total"]))
+
+
+def analyze(personas: list[dict] | None = None, encoding: str = DEFAULT_ENCODING) -> dict:
+    """
+    Token counts of the rendered prompt for each persona and prompt variant, with the
+    per-section breakdown of every variant.
+    """
+    variants = {}
+    for persona in personas or [DEFAULT_PERSONA]:
+        persona = {**DEFAULT_PERSONA, **persona}
+        key = "|".join(str(persona[field]) for field in DEFAULT_PERSONA)
+        tokens = {
+            variant.value: count_tokens(
+                custom_agent_prompt(**persona, variant=variant), encoding
+            )
+            for variant in PromptVariant
+        }
+        full = tokens[PromptVariant.FULL]
+        variants[key] = {
+            "tokens": tokens,
+            "saved_pct": {
+                name: round(100 * (full - count) / full, 1) if full else 0.0
+                for name, count in tokens.items()
+                if name != PromptVariant.FULL
+            },
+        }
+
+    return {
+        "encoding": encoding,
+        "variants": variants,
+        "sections": {
+            variant.value: section_breakdown(variant, encoding) for variant in PromptVariant
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    for field, default in DEFAULT_PERSONA.items():
+        parser.add_argument(f"--{field}", default=default)
+    parser.add_argument("--encoding", default=DEFAULT_ENCODING)
+    args = vars(parser.parse_args())
+    encoding = args.pop("encoding")
+    print(json.dumps(analyze([args], encoding), indent=2, ensure_ascii=False))
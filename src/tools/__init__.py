@@ -4,11 +4,17 @@ By importing them here, we can easily access all tools from a single module.
 """
 
 from .lead_management import save_lead
+from .project_info_tool import get_project_info
 from .project_units_tool import get_project_units
 from .response_formatter import finalize_response
+from .similar_units_tool import find_similar_units
+from .unit_stats_tool import get_unit_statistics
 
 __all__ = [
     "save_lead",    
     "get_project_units",
-    "finalize_response"
+    "get_project_info",
+    "finalize_response",
+    "get_unit_statistics",
+    "find_similar_units",
 ]
@@ -5,7 +5,7 @@ from datetime import datetime
 
 from langchain.tools import tool
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 LEADS_FILE_PATH = os.path.relpath(
     os.path.join(os.path.dirname(__file__), "tool_outputs", "leads.csv")
@@ -30,7 +30,7 @@ def save_lead(name: str, phone: str, unit_code: str, notes: str, **kwargs) -> st
     - A success or error message based on whether the lead was saved successfully.
     """
 
-    logging.info(f"Tool: Saving lead - Name: {name}, Phone: {phone}, Unit: {unit_code}")
+    logger.info(f"Tool: Saving lead - Unit: {unit_code}")
     try:
         # Define the header for the CSV file
         header = ["name", "phone", "unit_code", "notes", "timestamp"]
@@ -56,9 +56,9 @@ def save_lead(name: str, phone: str, unit_code: str, notes: str, **kwargs) -> st
             writer.writerow(lead_data)
 
         success_message = f"Successfully saved lead for {name}. A consultant will contact them shortly about unit {unit_code}."
-        logging.info(success_message)
+        logger.info(f"Saved lead for unit {unit_code}")
         return success_message
     except Exception as e:
         error_message = f"An error occurred while saving the lead: {e}"
-        logging.error(error_message)
+        logger.error(error_message)
         return error_message
@@ -0,0 +1,257 @@
+import asyncio
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tools.unit_projection import SPECULATIVE
+from tools.unit_resolver import normalize_text, word_number
+from tools.unit_snapshot import UnitSnapshot, get_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Shared by all sessions; prefetches are short filter passes over a cached snapshot
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+
+# Arguments the agent adds to every tool call, which never change the result
+_INJECTED_ARGS = {"dialect", "original_dialect"}
+
+_BEDROOM_WORDS = {"bedroom", "bedrooms", "bed", "beds", "br", "غرفه", "غرف", "غرفتين"}
+_FLOOR_WORDS = {"floor", "دور", "الدور", "طابق", "الطابق"}
+_FLOOR_ORDINALS = {
+    "ground": 0, "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10,
+    "ارضي": 0, "الارضي": 0, "اول": 1, "الاول": 1, "ثاني": 2, "الثاني": 2, "ثالث": 3,
+    "الثالث": 3, "رابع": 4, "الرابع": 4, "خامس": 5, "الخامس": 5, "سادس": 6,
+    "السادس": 6, "سابع": 7, "السابع": 7, "ثامن": 8, "الثامن": 8, "تاسع": 9,
+    "التاسع": 9, "عاشر": 10, "العاشر": 10,
+}  # fmt: skip
+_PRICE_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "الف": 1e3, "m": 1e6, "million": 1e6, "مليون": 1e6}
+# Prices below this are more likely areas, floors or counts
+_MIN_PRICE = 10_000
+# Longest run of words tried as a spoken unit code ("three cue", "٣ كيو")
+_CODE_WINDOW = 3
+
+
+def transcript_hints(text: str, snapshot: UnitSnapshot) -> Dict[str, Any]:
+    """
+    `get_project_units` arguments a (partial) user utterance points at: a unit code,
+    a bedroom count, a floor or a price.
+    """
+    text = normalize_text(text)
+    # Thousands separators, so "850,000" stays one number
+    text = re.sub(r"(?<=\d)[,٬](?=\d{3})", "", text)
+    tokens = [t for t in re.split(r"[^\w.]+|(?<!\d)\.|\.(?!\d)", text) if t]
+    hints: Dict[str, Any] = {}
+
+    for i, token in enumerate(tokens):
+        following = tokens[i + 1] if i + 1 < len(tokens) else ""
+        number = word_number(token)
+
+        if token == "غرفتين":
+            hints["unit_type"] = "2 BEDROOM"
+        elif number is not None and following in _BEDROOM_WORDS:
+            hints["unit_type"] = f"{number} BEDROOM"
+
+        if token in _FLOOR_WORDS and following:
+            floor = _FLOOR_ORDINALS.get(following, word_number(following))
+            if floor is not None:
+                hints["floor"] = str(floor)
+        elif token in _FLOOR_ORDINALS and following in _FLOOR_WORDS:
+            hints["floor"] = str(_FLOOR_ORDINALS[token])
+
+        if re.fullmatch(r"\d+(\.\d+)?", token):
+            value = float(token) * _PRICE_MULTIPLIERS.get(following, 1)
+            if value >= _MIN_PRICE:
+                hints["price"] = value
+
+    for size in range(1, _CODE_WINDOW + 1):
+        for i in range(len(tokens) - size + 1):
+            window = " ".join(tokens[i : i + size])
+            # A code needs a letter and a digit, spoken or written
+            if not any(word_number(t) is not None for t in tokens[i : i + size]):
+                continue
+            code, _ = snapshot.find_code(window)
+            if code:
+                hints["unit_code"] = code
+    return hints
+
+
+def predicted_calls(hints: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The `get_project_units` calls the agent is likely to make given `hints`"""
+    calls = []
+    if "unit_code" in hints:
+        calls.append({"unit_code": hints["unit_code"]})
+    filters = {k: v for k, v in hints.items() if k != "unit_code"}
+    if filters:
+        calls.append(filters)
+        calls.append({**filters, "availability": "available"})
+    return calls
+
+
+class ToolPrefetcher:
+    """
+    Speculatively runs the unit lookup the user is asking for while they are still
+    speaking.
+
+    Input transcription deltas are scanned for unit codes, bedroom counts, floors and
+    prices; the likely `get_project_units` calls run in the background and the wrapped
+    tool answers from them when the model's call matches, awaiting one still running
+    without blocking the event loop. Prefetches no call used by the end of the turn
+    are counted as wasted work.
+    """
+
+    def __init__(self, project_id: str, max_per_turn: int = 4):
+        self.project_id = project_id
+        self.max_per_turn = max_per_turn
+        self._transcript = ""
+        self._turn = 0
+        self._submitted = 0
+        # Guards the prefetches, which executor threads add and the event loop takes.
+        # One prediction runs at a time; deltas arriving meanwhile trigger a rerun
+        self._lock = threading.Lock()
+        self._predicting = False
+        self._rerun = False
+        self._pending: Dict[Tuple, Future] = {}
+        self._tool: Optional[Callable[..., Any]] = None
+        self._signature: Optional[inspect.Signature] = None
+
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.wasted_ms = 0.0
+        self.saved_ms = 0.0
+
+    def wrap(self, tool: Callable[..., Any]) -> Callable[..., Any]:
+        """`tool` as a coroutine function, answering from a matching prefetch when there is one"""
+        self._tool = tool
+        self._signature = inspect.signature(tool)
+
+        @functools.wraps(tool)
+        async def prefetched_tool(**kwargs):
+            key = self._key(kwargs)
+            with self._lock:
+                future = self._pending.pop(key, None)
+            if future is None:
+                self.misses += 1
+                return tool(**kwargs)
+            result, elapsed_ms, version = await asyncio.wrap_future(future)
+            snapshot = get_snapshot(self.project_id)
+            if snapshot is None or snapshot.version != version:
+                self.misses += 1
+                self.wasted += 1
+                self.wasted_ms += elapsed_ms
+                return tool(**kwargs)
+            self.hits += 1
+            self.saved_ms += elapsed_ms
+            logger.info(f"Prefetch hit for {tool.__name__}, saved {elapsed_ms:.1f} ms")
+            return result
+
+        return prefetched_tool
+
+    def observe(self, delta: str):
+        """Feeds an input transcription delta; predictions run on word boundaries"""
+        self._transcript += delta
+        if self._tool is None or not re.search(r"[\s.,،؟?!]$", delta):
+            return
+        with self._lock:
+            if self._submitted >= self.max_per_turn:
+                return
+            if self._predicting:
+                self._rerun = True
+                return
+            self._predicting = True
+        _executor.submit(self._predict, self._turn)
+
+    def end_turn(self):
+        """Drops the turn's transcript; unused prefetches count as wasted work"""
+        with self._lock:
+            unused = list(self._pending.values())
+            self._pending.clear()
+            self._turn += 1
+            self._submitted = 0
+        self._transcript = ""
+        for future in unused:
+            self.wasted += 1
+            if future.cancel():
+                continue
+            if future.done() and future.exception() is None:
+                self.wasted_ms += future.result()[1]
+
+    def _predict(self, turn: int):
+        """Runs off the event loop: extracts hints and submits the predicted calls"""
+        try:
+            while True:
+                self._submit_predictions(self._transcript, turn)
+                with self._lock:
+                    if not self._rerun or turn != self._turn:
+                        return
+                    self._rerun = False
+        except Exception as e:
+            logger.warning(f"Prefetch prediction failed: {e}")
+        finally:
+            with self._lock:
+                self._predicting = False
+                self._rerun = False
+
+    def _submit_predictions(self, transcript: str, turn: int):
+        snapshot = get_snapshot(self.project_id)
+        if snapshot is None:
+            return
+        for call in predicted_calls(transcript_hints(transcript, snapshot)):
+            args = {"project_id": self.project_id, **call}
+            key = self._key(args)
+            with self._lock:
+                if turn != self._turn or self._submitted >= self.max_per_turn:
+                    return
+                if key in self._pending:
+                    continue
+                self._submitted += 1
+                self.prefetched += 1
+                self._pending[key] = _executor.submit(self._run, args, snapshot.version)
+
+    def _run(self, args: Dict[str, Any], version: str) -> Tuple[Any, float, str]:
+        # Counted apart from the responses the model actually received
+        token = SPECULATIVE.set(True)
+        started = time.perf_counter()
+        try:
+            result = self._tool(**args)
+        finally:
+            SPECULATIVE.reset(token)
+        return result, 1000 * (time.perf_counter() - started), version
+
+    def _key(self, kwargs: Dict[str, Any]) -> Tuple:
+        """Call arguments with defaults, injected arguments and casing normalized away"""
+        args = {}
+        for name, value in kwargs.items():
+            if name in _INJECTED_ARGS or value is None:
+                continue
+            parameter = self._signature.parameters.get(name)
+            if parameter is not None and parameter.default == value:
+                continue
+            if name == "unit_code":
+                snapshot = get_snapshot(self.project_id)
+                value = (snapshot and snapshot.find_code(value)[0]) or value
+            if isinstance(value, str):
+                value = value.strip().lower()
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = float(value)
+            args[name] = value
+        return tuple(sorted((k, repr(v)) for k, v in args.items()))
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.hits + self.misses
+        return {
+            "prefetched": self.prefetched,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / calls, 3) if calls else None,
+            "wasted": self.wasted,
+            "wasted_ms": round(self.wasted_ms, 3),
+            "saved_ms": round(self.saved_ms, 3),
+        }
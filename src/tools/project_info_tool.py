@@ -0,0 +1,112 @@
+import difflib
+import logging
+import re
+from typing import Any, Dict, Optional
+
+from prompts.live_prompt import PROJECT_INFO_SECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[\W_]+", " ", text).strip().casefold()
+
+
+class KnowledgeStore:
+    """
+    In-memory index over the project knowledge base, built once at import.
+
+    Sections whose content is a dict of named entries (locations, villas, tour stops,
+    features) are indexed by normalized key; lookups fall back to a substring match and
+    then to the closest key, so "airport" or "fog villa" find their entry.
+    """
+
+    def __init__(self, sections: Dict[str, Any]):
+        self._sections = sections
+        self._index: Dict[str, Dict[str, str]] = {
+            name: {_normalize(key): key for key in content}
+            for name, content in sections.items()
+            if isinstance(content, dict)
+        }
+        self._section_names = {_normalize(name): name for name in sections}
+
+    def sections(self) -> Dict[str, list]:
+        """Each section with its keys (empty for sections returned whole)"""
+        return {name: list(self._index.get(name, {}).values()) for name in self._sections}
+
+    def resolve_section(self, section: str) -> Optional[str]:
+        normalized = _normalize(section)
+        if normalized in self._section_names:
+            return self._section_names[normalized]
+        match = difflib.get_close_matches(normalized, self._section_names, n=1, cutoff=0.6)
+        return self._section_names[match[0]] if match else None
+
+    def has_keys(self, section: str) -> bool:
+        return section in self._index
+
+    def resolve_key(self, section: str, key: str) -> Optional[str]:
+        keys = self._index.get(section, {})
+        normalized = _normalize(key)
+        if normalized in keys:
+            return keys[normalized]
+        partial = [k for k in keys if normalized in k or k in normalized]
+        if len(partial) == 1:
+            return keys[partial[0]]
+        match = difflib.get_close_matches(normalized, keys, n=1, cutoff=0.6)
+        return keys[match[0]] if match else None
+
+    def get(self, section: str, key: Optional[str] = None) -> Any:
+        content = self._sections[section]
+        if key is None:
+            return content
+        return content[key]
+
+
+KNOWLEDGE_STORE = KnowledgeStore(PROJECT_INFO_SECTIONS)
+
+
+def get_project_info(
+    section: Optional[str] = None, key: Optional[str] = None, **kwargs
+) -> Dict[str, Any]:
+    """
+    Looks up project knowledge: the project overview, nearby locations, villa layouts,
+    virtual tour stops, the master plan, key features and building information.
+    Call it whenever you need project details to answer the user.
+
+    Parameters:
+    - section (str): One of "project", "locations", "villas", "tour", "master_plan",
+      "features", "building". Omit it to list every section with its keys.
+    - key (str, optional): An entry within the section, e.g. "King Fahd International
+      Airport" in "locations" or "Fog Villa A" in "villas". Omit it to get the whole
+      section. Approximate names are matched to the closest entry.
+
+    Returns:
+    - {"section", "key", "content"} for the requested knowledge.
+    - {"error", "available"} listing valid sections or keys when nothing matches.
+    """
+    if not section:
+        return {"available": KNOWLEDGE_STORE.sections()}
+
+    resolved_section = KNOWLEDGE_STORE.resolve_section(section)
+    if resolved_section is None:
+        return {
+            "error": f"Unknown section: {section}",
+            "available": list(KNOWLEDGE_STORE.sections()),
+        }
+
+    resolved_key = None
+    # Sections without named entries (e.g. the master plan text) are returned whole
+    if key and KNOWLEDGE_STORE.has_keys(resolved_section):
+        resolved_key = KNOWLEDGE_STORE.resolve_key(resolved_section, key)
+        if resolved_key is None:
+            return {
+                "error": f"No {resolved_section} entry matches: {key}",
+                "available": KNOWLEDGE_STORE.sections()[resolved_section],
+            }
+
+    logger.info(f"Tool: Project info {resolved_section}/{resolved_key or '*'}")
+    return {
+        "section": resolved_section,
+        "key": resolved_key,
+        "content": KNOWLEDGE_STORE.get(resolved_section, resolved_key),
+    }
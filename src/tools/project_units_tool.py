@@ -1,10 +1,15 @@
+import base64
+import hashlib
+import heapq
+import json
 import logging
 import random
 from typing import Any, Dict, List, Optional
 from langchain.tools import tool
-from tools.units_fetcher import fetch_units_from_api
+from tools.unit_projection import PROJECTION_STATS, SHAPES, project_units, resolve_fields
+from tools.unit_snapshot import get_snapshot
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 
 def get_project_units(
@@ -26,10 +31,16 @@ def get_project_units(
     price_tolerance: Optional[float] = 0.05,
     area_tolerance: Optional[float] = 0.05,
     pick_random: Optional[bool] = False,
+    sort_by: Optional[str] = None,
+    order: Optional[str] = "asc",
+    limit: Optional[int] = 10,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    shape: Optional[str] = "records",
      **kwargs
 ) -> List[Dict[str, Any]]:
     """
-    Retrieves project units from a cached source (backed by `fetch_units_from_api("<project_id>")`).
+    Retrieves project units from a cached snapshot (backed by `fetch_units_from_api("<project_id>")`).
     The data is regularly updated, so the cache is ready for quick searches and filtering.
 
     This tool is useful for answering real-estate queries, such as:
@@ -41,7 +52,8 @@ def get_project_units(
     - "Show me units with sellable area around 90 sqm"
 
     Filtering Options:
-    - `unit_code` (str): Exact unit code (e.g., "1-A"). Case-insensitive exact match.
+    - `unit_code` (str): Unit code (e.g., "1-A"). Also accepts the code as the user said it,
+      e.g. "ثلاثة كيو", "اثنان إف" or "three Q"; pass it through as heard.
     - `unit_type` (str): Filter by unit type (e.g., "2 BEDROOM"). Partial, case-insensitive match.
     - `building` (str): Filter by building (e.g., "BLDG 1"). Partial, case-insensitive match.
     - `floor` (str): Filter by floor (e.g., "0", "1", "2").
@@ -59,23 +71,63 @@ def get_project_units(
     - `area_tolerance` (float): Tolerance for approximate area matching (default 0.05 = 5%).
     - `pick_random` (bool): If True, returns a single random unit from the filtered results.
 
+    Ordering & Paging:
+    - `sort_by` (str): "price", "sellable_area", "unit_area" or "floor", e.g. for "the cheapest" or "the largest".
+    - `order` (str): "asc" (default, cheapest / smallest first) or "desc".
+    - `limit` (int): Units per page (default 10, at most 50). Use 1 for "the cheapest one".
+    - `cursor` (str): The `next_cursor` of the previous page, with the same filters, for "show me more".
+
+    Response Fields:
+    - `fields` (list of str): Unit fields to return, or a profile: "lean" (default: code,
+      unit_type, sellable_area, price, availability, building, floor), "summary" (adds
+      unit_area and type) or "all". A lookup by `unit_code` returns "all" by default.
+    - `shape` (str): "records" (default, one dictionary per unit) or "columns" (one
+      {"columns": [...], "rows": [[...], ...]} entry, more compact for many units).
+
     Returns:
     - A list of units (as dictionaries) matching the applied filters.
-    - If too many results are found, returns a summarized list (first 10 units + count).
+    - If more units match than fit on the page, returns the page plus a
+      `summary_message` with the count and a `next_cursor` for the next page.
     - If no units match, returns a list with an error message.
     """
+    # Everything that defines the result set; a cursor is only valid for the same query
+    query = {
+        k: v for k, v in locals().items() if k not in ("limit", "cursor", "fields", "shape", "kwargs")
+    }
 
-    all_units = fetch_units_from_api(project_id)  # Import + Cached call
+    snapshot = get_snapshot(project_id)  # Cached call + indexes built at load
 
-    if not all_units:
+    if not snapshot:
         return [{"error": "Could not fetch units from API."}]
 
+    if shape not in SHAPES:
+        return [{"error": f"Unknown shape {shape}; use one of {SHAPES}"}]
+    try:
+        limit = max(1, min(int(limit or 10), MAX_PAGE_SIZE))
+    except (TypeError, ValueError, OverflowError):
+        return [{"error": f"Invalid limit {limit!r}; use a whole number from 1 to {MAX_PAGE_SIZE}."}]
+    order = (order or "asc").lower()
+    if order not in ("asc", "desc"):
+        return [{"error": f"Unknown order {order}; use 'asc' or 'desc'."}]
+    # Single-unit lookups ("tell me more about G-05") get every field by default
+    projected_fields = resolve_fields(fields, default="all" if unit_code else "lean")
+
     # Apply filters
-    filtered_units = all_units
+    filtered_units = snapshot.units
+    notes = []
     
-    # Exact match for unit code (case-insensitive)
+    # Unit code, resolved from spoken forms ("ثلاثة كيو" -> 3-Q) to the actual code
     if unit_code:
-        filtered_units = [u for u in filtered_units if u.get('code', '').lower() == unit_code.lower()]
+        resolved_code, candidates = snapshot.find_code(unit_code)
+        if resolved_code is None:
+            return [{
+                "error": f"No unit matches the code '{unit_code}'.",
+                "did_you_mean": [code for code, _ in candidates],
+            }]
+        if resolved_code.lower() != unit_code.lower():
+            logger.info(f"Resolved unit code '{unit_code}' to {resolved_code}")
+            notes.append({"summary_message": f"Interpreted '{unit_code}' as unit {resolved_code}."})
+        filtered_units = [snapshot.by_code[resolved_code.lower()]]
     
     # Partial match for unit_type (case-insensitive)
     if unit_type:
@@ -107,7 +159,7 @@ def get_project_units(
         max_price_range = target_price * (1 + price_tolerance)
         filtered_units = [u for u in filtered_units 
                          if min_price_range <= _safe_float(u.get('price', 0)) <= max_price_range]
-        logging.info(f"Price filter: target={target_price}, range=[{min_price_range:.2f}, {max_price_range:.2f}]")
+        logger.info(f"Price filter: target={target_price}, range=[{min_price_range:.2f}, {max_price_range:.2f}]")
     
     if min_price is not None:
         filtered_units = [u for u in filtered_units if _safe_float(u.get('price', 0)) >= min_price]
@@ -123,7 +175,7 @@ def get_project_units(
         max_area_range = target_area * (1 + area_tolerance)
         filtered_units = [u for u in filtered_units 
                          if min_area_range <= _safe_float(u.get('sellable_area', 0)) <= max_area_range]
-        logging.info(f"Sellable area filter: target={target_area}, range=[{min_area_range:.2f}, {max_area_range:.2f}]")
+        logger.info(f"Sellable area filter: target={target_area}, range=[{min_area_range:.2f}, {max_area_range:.2f}]")
     
     if min_sellable_area is not None:
         filtered_units = [u for u in filtered_units if _safe_float(u.get('sellable_area', 0)) >= min_sellable_area]
@@ -135,35 +187,91 @@ def get_project_units(
     if unit_type_filter:
         filtered_units = [u for u in filtered_units if u.get('type', '').lower() == unit_type_filter.lower()]
 
-    logging.info(f"Tool: Returning {len(filtered_units)} units after filtering cached data.")
+    logger.info(f"Tool: Returning {len(filtered_units)} units after filtering cached data.")
 
     # Handle picking a random unit from the (potentially filtered) results
     if pick_random:
         if filtered_units:
-            logging.info("Tool: Picking a random unit from the filtered results.")
-            return [random.choice(filtered_units)] # Return as a list with one item
+            logger.info("Tool: Picking a random unit from the filtered results.")
+            picked = [random.choice(filtered_units)]
+            return _project(picked, projected_fields, shape) + notes # Return as a list with one item
         else:
             return [{"error": "No units matched the criteria to pick a random one from."}]
 
-    if len(filtered_units) > 10:
-        summary = [
-            {
-                "code": u.get("code"),
-                "unit_type": u.get("unit_type"),
-                "unit_area": u.get("unit_area"),
-                "sellable_area": u.get("sellable_area"),
-                "price": u.get("price"),
-                "availability": u.get("availability"),
-                "building": u.get("building"),
-                "floor": u.get("floor"),
-                "type": u.get("type")
-            }
-            for u in filtered_units[:10]
-        ]
-        summary.append({"summary_message": f"Found {len(filtered_units)} units. Showing first 10."})
-        return summary
-    
-    return filtered_units
+    offset = 0
+    query_key = _query_key(query)
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None or position["q"] != query_key:
+            return [{"error": "Invalid cursor for this search. Repeat the search without a cursor."}]
+        if position["v"] != snapshot.version:
+            return [{"error": "The unit list has changed since the previous page. Repeat the search without a cursor."}]
+        offset = position["o"]
+
+    if sort_by:
+        try:
+            ranks = snapshot.facets.sort_ranks(sort_by, descending=order == "desc")
+        except ValueError as e:
+            return [{"error": str(e)}]
+        # Top-k by precomputed rank: O(n log k) instead of sorting every match
+        positions = snapshot.position
+        page = heapq.nsmallest(
+            offset + limit, filtered_units, key=lambda u: ranks[positions[id(u)]]
+        )[offset:]
+    else:
+        page = filtered_units[offset : offset + limit]
+
+    result = _project(page, projected_fields, shape)
+    total = len(filtered_units)
+    if offset or total > limit:
+        message = {"summary_message": f"Found {total} units. Showing {offset + 1}-{offset + len(page)}."}
+        if offset + len(page) < total:
+            message["next_cursor"] = _encode_cursor(snapshot.version, query_key, offset + len(page))
+        result.append(message)
+    
+    return result + notes
+
+
+def _project(
+    units: List[Dict[str, Any]], fields: Optional[List[str]], shape: str
+) -> List[Dict[str, Any]]:
+    """Projects a page of units and records the tokens it saves over full unit dicts"""
+    projected = project_units(units, fields, shape)
+    try:
+        saved = PROJECTION_STATS.record(units, projected)
+        logger.info(f"Tool: Projected {len(units)} units to {len(fields) if fields else 'all'} fields as {shape}, saving ~{saved} tokens")
+    except Exception as e:
+        logger.warning(f"Failed to record projection stats: {e}")
+    return projected
+
+
+# Largest page `get_project_units` returns
+MAX_PAGE_SIZE = 50
+
+
+def _query_key(query: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(query, sort_keys=True, default=str).encode()).hexdigest()[:10]
+
+
+def _encode_cursor(version: str, query_key: str, offset: int) -> str:
+    """Opaque cursor: the snapshot version and query it belongs to, and where the next page starts"""
+    payload = json.dumps({"v": version, "q": query_key, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Optional[Dict[str, Any]]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(payload)
+        if not {"v", "q", "o"} <= position.keys():
+            return None
+        offset = position["o"]
+        # A forged or corrupted offset must not reach the slicing
+        if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+            return None
+        return position
+    except (ValueError, TypeError, AttributeError):
+        return None
 
 
 def _safe_float(value: Any) -> float:
@@ -0,0 +1,70 @@
+import logging
+from typing import Any, Dict, Optional
+
+from tools.unit_projection import project_units, resolve_fields
+from tools.unit_snapshot import get_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Most alternatives one call returns
+MAX_SIMILAR = 10
+
+
+def find_similar_units(
+    project_id: str,
+    unit_code: str,
+    k: Optional[int] = 3,
+    only_available: Optional[bool] = True,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Finds the units most similar to a given unit, in one call. Use when a unit the user
+    likes is reserved or unlaunched, or when they ask for "something like this one":
+    - "3-Q is sold? Do you have anything similar?"
+    - "Show me alternatives to unit G-05."
+
+    Similarity weighs price, sellable area, unit area, bedrooms, floor and building.
+
+    Parameters:
+    - `project_id` (str): The project id.
+    - `unit_code` (str): The unit to find alternatives for (e.g., "3-Q"); spoken forms
+      such as "ثلاثة كيو" are accepted.
+    - `k` (int, optional): Number of alternatives (default 3, at most 10).
+    - `only_available` (bool, optional): Only suggest available units (default True).
+
+    Returns:
+    - "unit": the requested unit, and "similar": the alternatives, closest first, each
+      with a "match_score" between 0 and 1.
+    """
+    try:
+        k = max(1, min(int(k or 3), MAX_SIMILAR))
+    except (TypeError, ValueError, OverflowError):
+        return {"error": f"Invalid k {k!r}; use a whole number from 1 to {MAX_SIMILAR}."}
+
+    snapshot = get_snapshot(project_id)
+    if not snapshot:
+        return {"error": "Could not fetch units from API."}
+
+    resolved_code, candidates = snapshot.find_code(unit_code)
+    if resolved_code is None:
+        return {
+            "error": f"No unit matches the code '{unit_code}'.",
+            "did_you_mean": [code for code, _ in candidates],
+        }
+
+    unit = snapshot.by_code[resolved_code.lower()]
+    neighbours = snapshot.similarity.nearest(
+        snapshot.position[id(unit)], k, only_available=only_available is not False
+    )
+
+    fields = resolve_fields(None)
+    similar = project_units([snapshot.units[i] for i, _ in neighbours], fields)
+    for entry, (_, distance) in zip(similar, neighbours):
+        entry["match_score"] = round(1 / (1 + distance), 3)
+
+    logger.info(f"Tool: Found {len(similar)} units similar to {resolved_code}")
+    return {
+        "unit": project_units([unit], fields)[0],
+        "similar": similar,
+        "snapshot_version": snapshot.version,
+    }
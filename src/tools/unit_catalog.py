@@ -0,0 +1,164 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from tools.unit_snapshot import UnitSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Catalogs of this many recent snapshot versions are kept to compute deltas from
+CATALOG_HISTORY = 8
+# A delta touching more than this share of the units is sent as a full catalog instead
+MAX_DELTA_SHARE = 0.5
+
+
+class UnitCatalog:
+    """
+    Columnar copy of one snapshot's units for clients: every field once in `columns`
+    and one row per unit, keyed by unit code, versioned like the snapshot.
+    """
+
+    def __init__(self, snapshot: UnitSnapshot):
+        self.project_id = snapshot.project_id
+        self.version = snapshot.version
+        self.columns: List[str] = list(dict.fromkeys(k for u in snapshot.units for k in u))
+        self.rows: Dict[str, list] = {
+            str(u["code"]): [u.get(c) for c in self.columns]
+            for u in snapshot.units
+            if u.get("code")
+        }
+
+    def full(self) -> Dict[str, Any]:
+        return {
+            "mode": "full",
+            "version": self.version,
+            "columns": self.columns,
+            "rows": list(self.rows.values()),
+        }
+
+    def delta(self, previous: "UnitCatalog") -> Dict[str, Any]:
+        """Rows added or changed since `previous` and codes removed, or the full catalog"""
+        if previous.columns != self.columns:
+            return self.full()
+        upserts = [row for code, row in self.rows.items() if previous.rows.get(code) != row]
+        removed = [code for code in previous.rows if code not in self.rows]
+        if len(upserts) + len(removed) > MAX_DELTA_SHARE * max(len(self.rows), 1):
+            return self.full()
+        return {
+            "mode": "delta",
+            "from_version": previous.version,
+            "version": self.version,
+            "columns": self.columns,
+            "upserts": upserts,
+            "removed": removed,
+        }
+
+    def matches(self, unit: Dict[str, Any]) -> bool:
+        """Whether the catalog row of `unit`'s code agrees with all of its catalog fields"""
+        row = self.rows.get(str(unit.get("code")))
+        if row is None:
+            return False
+        return all(
+            row[i] == unit[c] for i, c in enumerate(self.columns) if c in unit
+        )
+
+
+_catalogs: "OrderedDict[tuple, UnitCatalog]" = OrderedDict()
+
+
+def catalog_for(snapshot: UnitSnapshot) -> UnitCatalog:
+    """The catalog of `snapshot`, built once and kept among the recent versions"""
+    key = (snapshot.project_id, snapshot.version)
+    if key in _catalogs:
+        _catalogs.move_to_end(key)
+        return _catalogs[key]
+    catalog = _catalogs[key] = UnitCatalog(snapshot)
+    while len(_catalogs) > CATALOG_HISTORY:
+        _catalogs.popitem(last=False)
+    return catalog
+
+
+class CatalogSync:
+    """
+    Keeps one client's copy of the unit catalog current: the full catalog once, then
+    only deltas when the snapshot changes. While the client is in sync, units in tool
+    responses are sent as references (`{"code": ...}` plus any fields the catalog
+    does not have) with the catalog version.
+    """
+
+    def __init__(self, project_id: str, client_version: Optional[str] = None):
+        self.project_id = project_id
+        # Version the client holds, e.g. from a catalog it persisted across sessions
+        self.client_version = client_version
+        self.full_sent = 0
+        self.deltas_sent = 0
+        self.units_referenced = 0
+
+    def update(self, snapshot: Optional[UnitSnapshot]) -> Optional[Dict[str, Any]]:
+        """The catalog message that brings the client to `snapshot`, None when current"""
+        if snapshot is None or snapshot.version == self.client_version:
+            return None
+        catalog = catalog_for(snapshot)
+        previous = _catalogs.get((self.project_id, self.client_version))
+        message = catalog.delta(previous) if previous else catalog.full()
+        if message["mode"] == "full":
+            self.full_sent += 1
+        else:
+            self.deltas_sent += 1
+        logger.info(
+            f"Catalog {message['mode']} {self.client_version} -> {catalog.version} for {self.project_id}"
+        )
+        self.client_version = catalog.version
+        return message
+
+    def request(
+        self, snapshot: Optional[UnitSnapshot], client_version: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Answers a client's sync request; it holds `client_version` (None for nothing)"""
+        self.client_version = client_version
+        if snapshot is not None and snapshot.version == client_version:
+            return {"mode": "current", "version": client_version}
+        return self.update(snapshot)
+
+    def reference_units(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """A copy of a tool response for the client, with catalog units as references"""
+        catalog = _catalogs.get((self.project_id, self.client_version))
+        if catalog is None:
+            return payload
+        referenced = 0
+
+        def reference(value: Any, depth: int = 0) -> Any:
+            nonlocal referenced
+            if isinstance(value, list) and depth < 3:
+                return [reference(v, depth + 1) for v in value]
+            if not isinstance(value, dict):
+                return value
+            if "code" in value and catalog.matches(value):
+                referenced += 1
+                extra = {k: v for k, v in value.items() if k not in catalog.columns}
+                return {"code": value["code"], **extra}
+            # Columnar pages ({"columns": [...], "rows": [...]}) become a list of codes
+            if value.keys() == {"columns", "rows"} and "code" in value["columns"] and set(
+                value["columns"]
+            ) <= set(catalog.columns):
+                units = [dict(zip(value["columns"], row)) for row in value["rows"]]
+                if all(catalog.matches(u) for u in units):
+                    referenced += len(units)
+                    return {"codes": [u["code"] for u in units]}
+            if depth < 3:
+                return {k: reference(v, depth + 1) for k, v in value.items()}
+            return value
+
+        compacted = reference(payload)
+        if not referenced:
+            return payload
+        self.units_referenced += referenced
+        return {**compacted, "catalog_version": catalog.version}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "client_version": self.client_version,
+            "full_sent": self.full_sent,
+            "deltas_sent": self.deltas_sent,
+            "units_referenced": self.units_referenced,
+        }
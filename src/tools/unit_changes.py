@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from tools.unit_snapshot import UnitSnapshot, add_snapshot_listener, get_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def unit_changes(before: Dict[str, Any], after: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Fields that differ between two versions of a unit, as {"from", "to"} pairs"""
+    if after is None:
+        return {}
+    return {
+        field: {"from": before.get(field), "to": after.get(field)}
+        for field in before.keys() | after.keys()
+        if before.get(field) != after.get(field)
+    }
+
+
+def referenced_codes(payload: Any, depth: int = 0) -> List[str]:
+    """Unit codes in a tool response: unit dicts, columnar pages and code lists"""
+    codes: List[str] = []
+    if depth > 3:
+        return codes
+    if isinstance(payload, list):
+        for value in payload:
+            codes.extend(referenced_codes(value, depth + 1))
+    elif isinstance(payload, dict):
+        if isinstance(payload.get("code"), str):
+            codes.append(payload["code"])
+        if isinstance(payload.get("columns"), list) and "code" in payload["columns"]:
+            column = payload["columns"].index("code")
+            codes.extend(row[column] for row in payload.get("rows", []))
+        for key, value in payload.items():
+            if isinstance(value, (list, dict)) and key not in ("columns", "rows"):
+                codes.extend(referenced_codes(value, depth + 1))
+    return codes
+
+
+class UnitWatch:
+    """
+    One session's subscription to the units it has discussed. Updates for them are
+    queued from whichever thread detects the change and consumed with `async for`.
+    """
+
+    def __init__(self, feed: "UnitChangeFeed", project_id: str, max_units: int = 100):
+        self._feed = feed
+        self.project_id = project_id
+        self.max_units = max_units
+        self._codes: "OrderedDict[str, None]" = OrderedDict()
+        self._loop = asyncio.get_running_loop()
+        self._updates: asyncio.Queue = asyncio.Queue()
+        self.delivered = 0
+
+    def watch(self, codes: Iterable[str]):
+        """Subscribes to `codes`; beyond `max_units` the least recently discussed drop out"""
+        for code in codes:
+            if code in self._codes:
+                self._codes.move_to_end(code)
+                continue
+            self._codes[code] = None
+            self._feed._subscribe(self, code)
+            if len(self._codes) > self.max_units:
+                dropped, _ = self._codes.popitem(last=False)
+                self._feed._unsubscribe(self, dropped)
+
+    def notify(self, update: Dict[str, Any]):
+        """Thread-safe: queues an update for the session"""
+        self._loop.call_soon_threadsafe(self._updates.put_nowait, update)
+
+    def close(self):
+        for code in self._codes:
+            self._feed._unsubscribe(self, code)
+        self._codes.clear()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        update = await self._updates.get()
+        self.delivered += 1
+        return update
+
+    def stats(self) -> Dict[str, Any]:
+        return {"watched_units": len(self._codes), "updates_delivered": self.delivered}
+
+
+class UnitChangeFeed:
+    """
+    Change detection over successive unit snapshots, fanned out to the sessions
+    watching the changed units.
+
+    Sessions are indexed by (project, unit code), so a new snapshot compares only the
+    watched units against their previous version and notifies only their watchers:
+    the work is O(watched units + changed units x interested sessions), independent
+    of the number of connected sessions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watchers: Dict[tuple, Set[UnitWatch]] = defaultdict(set)
+        self.snapshots = 0
+        self.changes = 0
+        self.notifications = 0
+        add_snapshot_listener(self._on_snapshot)
+
+    def subscribe(self, project_id: str, max_units: int = 100) -> UnitWatch:
+        """A new, empty watch for a session; call from the event loop"""
+        return UnitWatch(self, project_id, max_units)
+
+    def watched_projects(self) -> Set[str]:
+        with self._lock:
+            return {project_id for project_id, _ in self._watchers}
+
+    def _subscribe(self, watch: UnitWatch, code: str):
+        with self._lock:
+            self._watchers[(watch.project_id, code.lower())].add(watch)
+
+    def _unsubscribe(self, watch: UnitWatch, code: str):
+        key = (watch.project_id, code.lower())
+        with self._lock:
+            watchers = self._watchers.get(key)
+            if watchers is not None:
+                watchers.discard(watch)
+                if not watchers:
+                    del self._watchers[key]
+
+    def _on_snapshot(self, previous: Optional[UnitSnapshot], current: UnitSnapshot):
+        if previous is None:
+            return
+        self.snapshots += 1
+        with self._lock:
+            watched = {
+                code: set(watchers)
+                for (project_id, code), watchers in self._watchers.items()
+                if project_id == current.project_id
+            }
+        for code, watchers in watched.items():
+            before = previous.by_code.get(code)
+            if before is None:
+                continue
+            after = current.by_code.get(code)
+            changes = unit_changes(before, after)
+            if after is not None and not changes:
+                continue
+            self.changes += 1
+            update = {
+                "code": before.get("code"),
+                "version": current.version,
+                "removed": after is None,
+                "changes": changes,
+            }
+            for watch in watchers:
+                watch.notify(update)
+                self.notifications += 1
+        logger.info(
+            f"Units snapshot {previous.version} -> {current.version} for {current.project_id}: "
+            f"{len(watched)} watched units checked"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            watched = len(self._watchers)
+        return {
+            "watched_units": watched,
+            "snapshots": self.snapshots,
+            "changes": self.changes,
+            "notifications": self.notifications,
+        }
+
+
+UNIT_CHANGES = UnitChangeFeed()
+
+
+def resolve_codes(project_id: str, references: Iterable[str]) -> List[str]:
+    """Unit codes for references as a tool call received them ("ثلاثة كيو" -> 3-Q)"""
+    snapshot = get_snapshot(project_id)
+    if snapshot is None:
+        return []
+    codes = []
+    for reference in references:
+        code, _ = snapshot.find_code(str(reference))
+        if code:
+            codes.append(code)
+    return codes
+
+
+def describe_update(update: Dict[str, Any]) -> str:
+    """A one-line note of an update, for the model's context"""
+    if update["removed"]:
+        return f"Live update: unit {update['code']} is no longer listed."
+    changes = ", ".join(
+        f"{field} changed from {change['from']} to {change['to']}"
+        for field, change in update["changes"].items()
+    )
+    return f"Live update: unit {update['code']} {changes}."
@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Categorical fields units can be grouped and filtered by
+FACET_FIELDS = ("unit_type", "building", "floor", "availability")
+# Numeric fields summarized per group
+METRIC_FIELDS = ("price", "sellable_area", "unit_area")
+# Facet filters that match on a substring, like `get_project_units` does
+PARTIAL_MATCH_FIELDS = {"unit_type", "building"}
+# Fields units can be ordered by
+SORT_FIELDS = ("price", "sellable_area", "unit_area", "floor")
+
+
+def to_float(value: Any) -> float:
+    """A unit field as a float, NaN when it is missing or not numeric"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return float("nan")
+
+
+def _summary(values: np.ndarray) -> Optional[Dict[str, float]]:
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    return {
+        "min": round(float(values.min()), 2),
+        "max": round(float(values.max()), 2),
+        "median": round(float(np.median(values)), 2),
+    }
+
+
+class UnitFacets:
+    """
+    Columnar view of a snapshot's units for aggregate questions ("how many 2-bedroom
+    units are left and what's the price range?").
+
+    Each facet field is dictionary-encoded once (labels plus an integer code per unit)
+    and each metric is a float array, so a filtered, grouped aggregate is a handful of
+    vectorized mask operations. Answers are memoized per (filters, group_by) for the
+    lifetime of the snapshot; the unfiltered grouping by every facet is built at load.
+    """
+
+    def __init__(self, units: List[Dict[str, Any]]):
+        self.size = len(units)
+        self.labels: Dict[str, List[str]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for field in FACET_FIELDS:
+            values = [str(u.get(field) or "").strip() for u in units]
+            labels = sorted(set(values))
+            index = {label: i for i, label in enumerate(labels)}
+            self.labels[field] = labels
+            self.codes[field] = np.fromiter(
+                (index[v] for v in values), dtype=np.int32, count=len(values)
+            )
+        self.metrics: Dict[str, np.ndarray] = {
+            field: np.array([to_float(u.get(field)) for u in units], dtype=np.float64)
+            for field in METRIC_FIELDS
+        }
+
+        # Numeric value of every sortable field, NaN when missing
+        self.sort_keys: Dict[str, np.ndarray] = {
+            field: self.metrics[field]
+            if field in self.metrics
+            else np.array([to_float(u.get(field)) for u in units], dtype=np.float64)
+            for field in SORT_FIELDS
+        }
+
+        # Position of every unit in each sort order, ascending and descending; units
+        # missing the value sort last either way
+        self._ranks: Dict[Tuple[str, bool], List[int]] = {}
+        for field, values in self.sort_keys.items():
+            for descending in (False, True):
+                order = np.argsort(-values if descending else values, kind="stable")
+                ranks = np.empty(self.size, dtype=np.int64)
+                ranks[order] = np.arange(self.size)
+                self._ranks[(field, descending)] = ranks.tolist()
+
+        self._cache: Dict[Tuple, Dict[str, Any]] = {}
+        for field in FACET_FIELDS:
+            self.aggregate(group_by=field)
+
+    def sort_ranks(self, field: str, descending: bool = False) -> List[int]:
+        """Rank of each unit (by snapshot position) when ordered by `field`"""
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {field}; use one of {SORT_FIELDS}")
+        return self._ranks[(field, descending)]
+
+    def _mask(self, filters: Dict[str, str]) -> np.ndarray:
+        mask = np.ones(self.size, dtype=bool)
+        for field, wanted in filters.items():
+            wanted = str(wanted).strip().lower()
+            if field in PARTIAL_MATCH_FIELDS:
+                matching = [i for i, l in enumerate(self.labels[field]) if wanted in l.lower()]
+            else:
+                matching = [i for i, l in enumerate(self.labels[field]) if l.lower() == wanted]
+            mask &= np.isin(self.codes[field], matching)
+        return mask
+
+    def _stats(self, mask: np.ndarray) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"count": int(mask.sum())}
+        for field, values in self.metrics.items():
+            stats[field] = _summary(values[mask])
+        return stats
+
+    def aggregate(
+        self, filters: Optional[Dict[str, str]] = None, group_by: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Counts and min / max / median of every metric, overall and per `group_by` label"""
+        if group_by is not None and group_by not in FACET_FIELDS:
+            raise ValueError(f"Cannot group by {group_by}; use one of {FACET_FIELDS}")
+        filters = {k: v for k, v in (filters or {}).items() if v not in (None, "")}
+        key = (tuple(sorted(filters.items())), group_by)
+        if key in self._cache:
+            return self._cache[key]
+
+        mask = self._mask(filters)
+        result: Dict[str, Any] = {"overall": self._stats(mask)}
+        if group_by is not None:
+            codes = self.codes[group_by]
+            counts = np.bincount(codes[mask], minlength=len(self.labels[group_by]))
+            result["groups"] = {
+                label or "unknown": self._stats(mask & (codes == i))
+                for i, label in enumerate(self.labels[group_by])
+                if counts[i]
+            }
+        self._cache[key] = result
+        return result
@@ -0,0 +1,106 @@
+import json
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Named field sets a tool call can ask for; None means every field from the API
+FIELD_PROFILES: Dict[str, Optional[tuple]] = {
+    "lean": ("code", "unit_type", "sellable_area", "price", "availability", "building", "floor"),
+    "summary": (
+        "code", "unit_type", "unit_area", "sellable_area", "price", "availability",
+        "building", "floor", "type",
+    ),
+    "all": None,
+}  # fmt: skip
+DEFAULT_PROFILE = "lean"
+# Response shapes: a list of unit dicts, or one header list plus a row per unit
+SHAPES = ("records", "columns")
+# Token estimate for response savings: compact JSON runs about four UTF-8 bytes per
+# token; `prompts.prompt_budget` has exact counts but is too slow for every tool call
+BYTES_PER_TOKEN = 4
+# Set while a tool call runs speculatively (see `tools.prefetch`); such responses may
+# never reach the model, so they are counted separately
+SPECULATIVE: ContextVar[bool] = ContextVar("speculative_projection", default=False)
+
+
+def resolve_fields(fields: Optional[Sequence[str]], default: str = DEFAULT_PROFILE) -> Optional[List[str]]:
+    """
+    The field names a `fields` argument selects: profile names expand to their
+    fields, anything else is taken as a field name. `code` is always included.
+    """
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",")]
+    selected: List[str] = []
+    for name in fields or [default]:
+        if name in FIELD_PROFILES:
+            if FIELD_PROFILES[name] is None:
+                return None
+            selected.extend(FIELD_PROFILES[name])
+        elif name:
+            selected.append(name)
+    return list(dict.fromkeys(["code", *selected]))
+
+
+def project_units(
+    units: List[Dict[str, Any]], fields: Optional[List[str]], shape: str = "records"
+) -> List[Dict[str, Any]]:
+    """`units` reduced to `fields` (all of them when None), as records or columns"""
+    if shape == "columns":
+        columns = fields or list(dict.fromkeys(k for u in units for k in u))
+        return [{"columns": columns, "rows": [[u.get(f) for f in columns] for u in units]}]
+    if fields is None:
+        return list(units)
+    return [{f: u[f] for f in fields if f in u} for u in units]
+
+
+class ProjectionStats:
+    """
+    Estimated tokens tool responses would have cost with full unit dicts versus what
+    was sent (see `BYTES_PER_TOKEN`). Speculative calls are only counted, apart.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.units = 0
+        self.full_tokens = 0
+        self.sent_tokens = 0
+        self.speculative_calls = 0
+
+    def record(self, units: List[Dict[str, Any]], payload: List[Dict[str, Any]]) -> int:
+        """Counts one response and returns the tokens it saved"""
+        full = _tokens(units)
+        sent = _tokens(payload)
+        if SPECULATIVE.get():
+            self.speculative_calls += 1
+            return full - sent
+        self.calls += 1
+        self.units += len(units)
+        self.full_tokens += full
+        self.sent_tokens += sent
+        return full - sent
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "units": self.units,
+            "full_tokens": self.full_tokens,
+            "sent_tokens": self.sent_tokens,
+            "saved_tokens": self.full_tokens - self.sent_tokens,
+            "ratio": round(self.sent_tokens / self.full_tokens, 3) if self.full_tokens else None,
+            "speculative_calls": self.speculative_calls,
+        }
+
+
+def _tokens(value: Any) -> int:
+    size = len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+    return -(-size // BYTES_PER_TOKEN)
+
+
+PROJECTION_STATS = ProjectionStats()
+
+
+def projection_stats() -> Dict[str, Any]:
+    """Token savings of projected unit responses since startup"""
+    return PROJECTION_STATS.stats()
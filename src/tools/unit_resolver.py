@@ -0,0 +1,205 @@
+import itertools
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Arabic-Indic and Eastern Arabic-Indic (Persian/Urdu) digits
+_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹", "01234567890123456789")
+
+_ARABIC_NUMBERS = {
+    "صفر": 0,
+    "واحد": 1, "واحده": 1, "وحده": 1,
+    "اثنان": 2, "اثنين": 2, "اتنين": 2, "اثنا": 2, "اثني": 2, "تنين": 2,
+    "ثلاثه": 3, "ثلاث": 3, "تلاته": 3, "تلات": 3,
+    "اربعه": 4, "اربع": 4,
+    "خمسه": 5, "خمس": 5,
+    "سته": 6, "ست": 6,
+    "سبعه": 7, "سبع": 7,
+    "ثمانيه": 8, "ثمان": 8, "ثماني": 8, "تمانيه": 8, "تمان": 8,
+    "تسعه": 9, "تسع": 9,
+    "عشره": 10,
+}  # fmt: skip
+_ENGLISH_NUMBERS = {
+    "zero": 0, "oh": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19, "twenty": 20,
+}  # fmt: skip
+# "ثلاثة عشر" (thirteen): a units word followed by "عشر"
+_ARABIC_TEENS_SUFFIX = {"عشر", "عشره"}
+
+# Spoken names of Latin letters; some Arabic spellings are ambiguous ("اي" is A, E or I)
+_ARABIC_LETTERS = {
+    "ايه": "A", "اي": "AEI", "بي": "BP", "سي": "C", "دي": "D", "اف": "F", "ايف": "F",
+    "جي": "GJ", "اتش": "H", "اتشي": "H", "اش": "H", "جاي": "J", "جيه": "J", "كي": "K",
+    "كيه": "K", "كاي": "K", "ال": "L", "ايل": "L", "ام": "M", "ايم": "M", "ان": "N",
+    "اين": "N", "او": "O", "اوه": "O", "كيو": "Q", "ار": "R", "اس": "S", "ايس": "S",
+    "تي": "T", "يو": "U", "في": "V", "دبليو": "W", "دابليو": "W", "اكس": "X",
+    "واي": "Y", "زد": "Z", "زي": "Z", "زيد": "Z",
+}  # fmt: skip
+# A lone Arabic letter read out in place of the Latin letter that sounds alike
+_ARABIC_SINGLE_LETTERS = {
+    "ا": "A", "ب": "BP", "ت": "T", "ج": "GJ", "ح": "H", "د": "D", "ذ": "Z", "ر": "R",
+    "ز": "Z", "س": "SC", "ص": "S", "ض": "D", "ط": "T", "ظ": "Z", "غ": "G", "ف": "FV",
+    "ق": "QK", "ك": "KC", "ل": "L", "م": "M", "ن": "N", "ه": "HE", "و": "WO", "ي": "YI",
+}  # fmt: skip
+_ENGLISH_LETTERS = {
+    "ay": "A", "bee": "B", "be": "B", "see": "C", "sea": "C", "cee": "C", "dee": "D",
+    "ee": "E", "ef": "F", "eff": "F", "gee": "G", "aitch": "H", "eye": "I", "jay": "J",
+    "kay": "K", "el": "L", "ell": "L", "em": "M", "en": "N", "pee": "P", "cue": "Q",
+    "queue": "Q", "kew": "Q", "are": "R", "ar": "R", "ess": "S", "tee": "T", "tea": "T",
+    "you": "U", "vee": "V", "ex": "X", "why": "Y", "wye": "Y", "zed": "Z", "zee": "Z",
+    # NATO alphabet
+    "alpha": "A", "alfa": "A", "bravo": "B", "charlie": "C", "delta": "D", "echo": "E",
+    "foxtrot": "F", "golf": "G", "hotel": "H", "india": "I", "juliet": "J", "kilo": "K",
+    "lima": "L", "mike": "M", "november": "N", "oscar": "O", "papa": "P", "quebec": "Q",
+    "romeo": "R", "sierra": "S", "tango": "T", "uniform": "U", "victor": "V",
+    "whiskey": "W", "xray": "X", "yankee": "Y", "zulu": "Z",
+}  # fmt: skip
+# Words around a spoken code that carry no part of it
+_FILLER = {
+    "وحده", "الوحده", "بالوحده", "للوحده", "رقم", "الرقم", "كود", "الكود", "شقه",
+    "الشقه", "فيلا", "الفيلا", "unit", "number", "no", "code", "apartment", "villa",
+    "the", "double",
+}  # fmt: skip
+# Never more than this many readings of one ambiguous reference are looked up
+_MAX_READINGS = 32
+
+
+def normalize_arabic(text: str) -> str:
+    """Strip diacritics and tatweel, unify alef / ya / ta marbuta spellings"""
+    text = "".join(c for c in text if not unicodedata.combining(c)).replace("ـ", "")
+    text = re.sub("[أإآٱ]", "ا", text)
+    return text.replace("ى", "ي").replace("ة", "ه").replace("ؤ", "و").replace("ئ", "ي")
+
+
+def normalize_text(text: str) -> str:
+    """Casefolded, Arabic-normalized text with Arabic-Indic digits as ASCII digits"""
+    return normalize_arabic(text.translate(_DIGITS).casefold())
+
+
+def word_number(token: str) -> Optional[int]:
+    """The value of a normalized number token: "3", "three" or "ثلاثه" -> 3"""
+    if token.isdigit():
+        return int(token)
+    return _ARABIC_NUMBERS.get(token, _ENGLISH_NUMBERS.get(token))
+
+
+def canonical_code(code: str) -> str:
+    """`"3-Q"`, `"3q"` and `"3 Q"` all become `"3Q"`"""
+    return re.sub(r"[\W_]+", "", code).upper()
+
+
+def _symbols(token: str) -> Optional[List[str]]:
+    """Alternative code fragments a spoken or written token may stand for"""
+    if token in _FILLER:
+        return [""]
+    for table in (_ARABIC_NUMBERS, _ENGLISH_NUMBERS):
+        if token in table:
+            return [str(table[token])]
+    # Codes typed as-is ("3q", "g", "05"); longer plain words are not code fragments
+    if re.fullmatch(r"[a-z0-9]+", token) and (
+        len(token) <= 3 or any(c.isdigit() for c in token)
+    ) and token not in _ENGLISH_LETTERS:
+        return [token.upper()]
+    for table in (_ARABIC_LETTERS, _ENGLISH_LETTERS, _ARABIC_SINGLE_LETTERS):
+        if token in table:
+            return list(table[token])
+    # "والف" / "وثلاثه": the conjunction "و" prefixed to a word
+    if token.startswith("و") and len(token) > 2:
+        return _symbols(token[1:])
+    return None
+
+
+def spoken_readings(reference: str) -> List[str]:
+    """
+    Canonical codes a spoken or typed reference may denote, e.g. "ثلاثة كيو", "٣-Q",
+    "three cue" or "unit 3q" -> ["3Q"]. Ambiguous letter names yield one reading per
+    letter.
+    """
+    text = normalize_text(reference)
+    # Split on punctuation and between digits and letters ("٢ف" -> "2", "ف")
+    text = re.sub(r"(?<=\d)(?=[^\W\d_])|(?<=[^\W\d_])(?=\d)", " ", text)
+    tokens = [t for t in re.split(r"[\W_]+", text) if t]
+
+    fragments: List[List[str]] = []
+    for token in tokens:
+        if token in _ARABIC_TEENS_SUFFIX and fragments and fragments[-1][0].isdigit():
+            fragments[-1] = [str(10 + int(fragments[-1][0]))]
+            continue
+        symbols = _symbols(token)
+        # Words that cannot be part of a code ("please", "في الدور") are skipped
+        if symbols is not None:
+            fragments.append(symbols)
+
+    readings = []
+    for combination in itertools.islice(itertools.product(*fragments), _MAX_READINGS):
+        reading = "".join(combination)
+        if reading and reading not in readings:
+            readings.append(reading)
+    return readings
+
+
+def _ngrams(text: str, n: int = 2) -> set:
+    padded = f"^{text}$"
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+def _edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = current
+    return previous[-1]
+
+
+class UnitCodeResolver:
+    """
+    Resolves how users say or type unit codes to the snapshot's actual codes.
+
+    Codes are indexed by canonical form and by character bigrams; a reference is
+    expanded into its possible readings (see `spoken_readings`), each reading is looked
+    up exactly, and otherwise candidates sharing bigrams are ranked by edit distance.
+    """
+
+    def __init__(self, codes: Iterable[str]):
+        self._codes: Dict[str, str] = {}
+        self._grams: Dict[str, set] = defaultdict(set)
+        for code in codes:
+            if not code:
+                continue
+            canonical = canonical_code(code)
+            self._codes.setdefault(canonical, code)
+            for gram in _ngrams(canonical):
+                self._grams[gram].add(canonical)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def resolve(self, reference: str, limit: int = 3) -> List[Tuple[str, float]]:
+        """
+        Candidate codes for `reference` with a score in (0, 1], best first.
+        A score of 1.0 means an exact match of one of its readings.
+        """
+        readings = spoken_readings(reference)
+        exact = [self._codes[r] for r in readings if r in self._codes]
+        if exact:
+            return [(code, 1.0) for code in exact[:limit]]
+
+        scored: Dict[str, float] = {}
+        for reading in readings:
+            candidates = set().union(*(self._grams.get(g, ()) for g in _ngrams(reading)))
+            for canonical in candidates:
+                distance = _edit_distance(reading, canonical)
+                if distance > max(1, len(reading) // 3):
+                    continue
+                score = 1 - distance / max(len(reading), len(canonical))
+                scored[canonical] = max(scored.get(canonical, 0.0), score)
+
+        ranked = sorted(scored.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [(self._codes[c], round(s, 3)) for c, s in ranked[:limit] if s > 0]
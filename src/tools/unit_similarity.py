@@ -0,0 +1,79 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from tools.unit_facets import UnitFacets
+
+# Relative weight of each feature in the distance; buildings count as one feature
+FEATURE_WEIGHTS = {
+    "price": 1.5,
+    "sellable_area": 1.0,
+    "unit_area": 0.5,
+    "bedrooms": 1.5,
+    "floor": 0.5,
+    "building": 0.5,
+}
+AVAILABLE = "available"
+
+
+def bedroom_count(unit_type: Any) -> float:
+    """`"2.5 BEDROOM"` -> 2.5, `"Studio"` -> 0, NaN when the type says nothing about it"""
+    text = str(unit_type or "").lower()
+    match = re.search(r"(\d+(?:\.\d+)?)\s*(?:bed|br\b)", text)
+    if match:
+        return float(match.group(1))
+    return 0.0 if "studio" in text else float("nan")
+
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    """z-scores, with missing values at the mean so they neither attract nor repel"""
+    known = values[~np.isnan(values)]
+    if not len(known) or not known.std():
+        return np.zeros_like(values)
+    scaled = (values - known.mean()) / known.std()
+    scaled[np.isnan(scaled)] = 0.0
+    return scaled
+
+
+class UnitSimilarity:
+    """
+    Nearest-neighbour search over a snapshot's units ("something like 3-Q, but
+    available").
+
+    Every unit is a row of weighted, standardized features, with the building one-hot
+    encoded, so the neighbours of a unit are one vectorized distance computation
+    against the whole matrix followed by a partial sort.
+    """
+
+    def __init__(self, units: List[Dict[str, Any]], facets: UnitFacets):
+        numeric = {
+            "price": facets.metrics["price"],
+            "sellable_area": facets.metrics["sellable_area"],
+            "unit_area": facets.metrics["unit_area"],
+            "bedrooms": np.array([bedroom_count(u.get("unit_type")) for u in units]),
+            "floor": facets.sort_keys["floor"],
+        }
+        columns = [FEATURE_WEIGHTS[name] * _standardize(values) for name, values in numeric.items()]
+        # A different building adds FEATURE_WEIGHTS["building"] to the distance
+        buildings = np.eye(len(facets.labels["building"]))[facets.codes["building"]]
+        buildings *= FEATURE_WEIGHTS["building"] / np.sqrt(2)
+        self.vectors = np.column_stack([*columns, buildings]).astype(np.float32)
+
+        labels = [label.lower() for label in facets.labels["availability"]]
+        self.available = facets.codes["availability"] == (
+            labels.index(AVAILABLE) if AVAILABLE in labels else -1
+        )
+
+    def nearest(self, position: int, k: int = 5, only_available: bool = True) -> List[Tuple[int, float]]:
+        """Positions of the `k` units closest to the unit at `position`, with distances"""
+        distances = np.sqrt(((self.vectors - self.vectors[position]) ** 2).sum(axis=1))
+        distances[position] = np.inf
+        if only_available:
+            distances[~self.available] = np.inf
+        k = min(k, int(np.isfinite(distances).sum()))
+        if k <= 0:
+            return []
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        return [(int(i), float(distances[i])) for i in nearest]
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tools.unit_facets import UnitFacets
+from tools.unit_resolver import UnitCodeResolver
+from tools.unit_similarity import UnitSimilarity
+from tools.units_fetcher import fetch_units_from_api
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_version(units: List[Dict[str, Any]]) -> str:
+    """Content hash of a list of units"""
+    return hashlib.sha1(
+        json.dumps(units, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:12]
+
+
+class UnitSnapshot:
+    """
+    One fetched list of a project's units, with the indexes the unit tools need built
+    once at load. `version` is a content hash, so it only changes when the data does.
+    """
+
+    def __init__(self, project_id: str, units: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        self.project_id = project_id
+        self.units = units
+        self.version = snapshot_version(units)
+        self.loaded_at = time.time()
+
+        # Snapshot position of each unit dict, for the precomputed sort orders
+        self.position: Dict[int, int] = {id(u): i for i, u in enumerate(units)}
+        self.by_code: Dict[str, Dict[str, Any]] = {
+            str(u.get("code", "")).lower(): u for u in units if u.get("code")
+        }
+        self.code_resolver = UnitCodeResolver(u.get("code") for u in units)
+        self.facets = UnitFacets(units)
+        self.similarity = UnitSimilarity(units, self.facets)
+
+        self.build_ms = round(1000 * (time.perf_counter() - started), 3)
+        logger.info(
+            f"Loaded units snapshot {self.version} for {project_id}: "
+            f"{len(units)} units, indexed in {self.build_ms} ms"
+        )
+
+    def find_code(self, reference: str) -> Tuple[Optional[str], list]:
+        """
+        The unit code `reference` denotes, if it resolves unambiguously, and the
+        ranked candidates otherwise.
+        """
+        if reference.lower() in self.by_code:
+            return self.by_code[reference.lower()]["code"], []
+        candidates = self.code_resolver.resolve(reference)
+        exact = [code for code, score in candidates if score == 1.0]
+        if len(exact) == 1:
+            return exact[0], candidates
+        return None, candidates
+
+
+_snapshots: Dict[str, UnitSnapshot] = {}
+# The `fetch_units_from_api` result each project's snapshot is current with
+_fetched: Dict[str, List[Dict[str, Any]]] = {}
+# Called with (previous, current) whenever a project gets a snapshot with new data
+_listeners: List[Callable[[Optional[UnitSnapshot], UnitSnapshot], None]] = []
+
+
+def add_snapshot_listener(listener: Callable[[Optional[UnitSnapshot], UnitSnapshot], None]):
+    _listeners.append(listener)
+
+
+def _install(project_id: str, snapshot: UnitSnapshot):
+    previous = _snapshots.get(project_id)
+    _snapshots[project_id] = snapshot
+    if previous is not None and previous.version == snapshot.version:
+        return
+    for listener in _listeners:
+        try:
+            listener(previous, snapshot)
+        except Exception as e:
+            logger.error(f"Snapshot listener failed for {project_id}: {e}")
+
+
+def get_snapshot(project_id: str) -> Optional[UnitSnapshot]:
+    """
+    The current snapshot of a project's units. A new snapshot (and new indexes) is
+    built whenever `fetch_units_from_api` returns a different list, e.g. after its
+    cache is invalidated, or by `refresh_snapshot`.
+    """
+    units = fetch_units_from_api(project_id)
+    if not units:
+        return None
+    if project_id not in _snapshots or _fetched.get(project_id) is not units:
+        _fetched[project_id] = units
+        _install(project_id, UnitSnapshot(project_id, units))
+    return _snapshots[project_id]
+
+
+def refresh_snapshot(project_id: str) -> Optional[UnitSnapshot]:
+    """
+    Fetches the project's units past the `fetch_units_from_api` cache and installs a
+    new snapshot if they changed. Blocking; run it off the event loop.
+    """
+    units = fetch_units_from_api.__wrapped__(project_id)
+    if not units:
+        return _snapshots.get(project_id)
+    current = _snapshots.get(project_id)
+    if current is not None and current.version == snapshot_version(units):
+        return current
+    snapshot = UnitSnapshot(project_id, units)
+    _install(project_id, snapshot)
+    return snapshot
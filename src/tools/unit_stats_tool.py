@@ -0,0 +1,55 @@
+import logging
+from typing import Any, Dict, Optional
+
+from tools.unit_snapshot import get_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def get_unit_statistics(
+    project_id: str,
+    group_by: Optional[str] = None,
+    unit_type: Optional[str] = None,
+    building: Optional[str] = None,
+    floor: Optional[str] = None,
+    availability: Optional[str] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Answers inventory questions with counts and ranges instead of unit lists, e.g.:
+    - "How many 2-bedroom units are left and what's the price range?"
+    - "Which buildings still have available units?"
+    - "What is the cheapest and most expensive unit on the third floor?"
+    Prefer this over `get_project_units` whenever the user asks how many, which kinds
+    or what range, rather than about specific units.
+
+    Parameters:
+    - `project_id` (str): The project id.
+    - `group_by` (str, optional): One of "unit_type", "building", "floor", "availability".
+      Returns the statistics per group as well as overall.
+    - `unit_type` (str, optional): Filter, partial case-insensitive match (e.g., "2 BEDROOM").
+    - `building` (str, optional): Filter, partial case-insensitive match (e.g., "BLDG 1").
+    - `floor` (str, optional): Filter, exact match (e.g., "0", "1", "2").
+    - `availability` (str, optional): Filter, exact match (e.g., "available", "unlaunched").
+
+    Returns:
+    - "overall" and, when grouped, "groups": each with "count" and min / max / median of
+      "price", "sellable_area" and "unit_area".
+    """
+    snapshot = get_snapshot(project_id)
+    if not snapshot:
+        return {"error": "Could not fetch units from API."}
+
+    filters = {
+        "unit_type": unit_type,
+        "building": building,
+        "floor": floor,
+        "availability": availability,
+    }
+    try:
+        result = snapshot.facets.aggregate(filters, group_by)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    logger.info(f"Tool: Unit statistics grouped by {group_by}: {result['overall']['count']} units")
+    return {**result, "snapshot_version": snapshot.version}
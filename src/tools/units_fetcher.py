@@ -5,7 +5,7 @@ from typing import Any, Dict, List, Optional
 from requests.exceptions import ConnectionError, RequestException, Timeout
 import time
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # Initialize the scraper once
 # We have use cloudscraper to handle potential bot detection because it can simulate a real browser environment which the requests library cannot.
@@ -25,21 +25,21 @@ def fetch_units_from_api(project_id: str) -> List[Dict[str, Any]]:
 
     for attempt in range(retries):
         try:
-            logging.info(f"API: Attempt {attempt + 1}/{retries} to fetch data from {api_url}")
+            logger.info(f"API: Attempt {attempt + 1}/{retries} to fetch data from {api_url}")
             response = scraper.get(api_url, timeout=15)
             response.raise_for_status()
             all_units = response.json().get("data", {}).get("units", [])
-            logging.info(f"API: Retrieved {len(all_units)} units for project {project_id}")
+            logger.info(f"API: Retrieved {len(all_units)} units for project {project_id}")
             return all_units
 
         except (ConnectionError, Timeout, RequestException) as e:
-            logging.warning(f"API: Attempt {attempt + 1} failed: {e}")
+            logger.warning(f"API: Attempt {attempt + 1} failed: {e}")
             if attempt < retries - 1:
                 wait = 2**attempt
-                logging.info(f"API: Retrying in {wait} seconds...")
+                logger.info(f"API: Retrying in {wait} seconds...")
                 time.sleep(wait)
             else:
-                logging.error("API: All retries failed.")
+                logger.error("API: All retries failed.")
                 return []
 
     return []
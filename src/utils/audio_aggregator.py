@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class AudioFrameAggregator:
+    """
+    Coalesces small PCM parts into fixed-duration frames before they are sent on.
+    Used both for Live API audio going to the client and for microphone audio going
+    upstream to the Live API.
+
+    Each full frame is handed to `send` as soon as it is complete. A partial frame is
+    flushed once its oldest byte has waited `max_delay_ms`, or when `flush()` is called
+    explicitly (e.g. before a non-audio message that must keep its ordering).
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        frame_ms: int = 60,
+        max_delay_ms: int = 120,
+        sample_rate: int = 24000,
+        channels: int = 1,
+        sampwidth: int = 2,
+    ):
+        self._send = send
+        self._frame_bytes = max(
+            channels * sampwidth,
+            sample_rate * channels * sampwidth * frame_ms // 1000,
+        )
+        # Keep frames aligned to whole samples
+        self._frame_bytes -= self._frame_bytes % (channels * sampwidth)
+        self._max_delay = max_delay_ms / 1000
+        self._buffer = bytearray()
+        self._buffer_since: float | None = None
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+
+        self.parts_in = 0
+        self.bytes_in = 0
+        self.frames_out = 0
+        self.timer_flushes = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._started_at = time.monotonic()
+
+    async def push(self, pcm: bytes):
+        """Add a PCM part and send every frame it completes"""
+        if not pcm:
+            return
+
+        self.parts_in += 1
+        self.bytes_in += len(pcm)
+
+        if not self._buffer:
+            self._buffer_since = time.monotonic()
+            self._schedule_flush()
+        self._buffer.extend(pcm)
+
+        async with self._lock:
+            emitted = False
+            while len(self._buffer) >= self._frame_bytes:
+                frame = bytes(self._buffer[: self._frame_bytes])
+                del self._buffer[: self._frame_bytes]
+                await self._emit(frame)
+                emitted = True
+
+            if not self._buffer:
+                self._cancel_flush()
+            elif emitted:
+                # The remainder belongs to the part that just arrived
+                self._buffer_since = time.monotonic()
+                self._schedule_flush()
+
+    async def flush(self):
+        """Send whatever is buffered as a (possibly short) frame"""
+        self._cancel_flush()
+        async with self._lock:
+            if not self._buffer:
+                return
+            frame = bytes(self._buffer)
+            self._buffer.clear()
+            await self._emit(frame)
+
+    def discard(self) -> int:
+        """Drop buffered audio without sending it; returns the number of bytes dropped"""
+        self._cancel_flush()
+        dropped = len(self._buffer)
+        self._buffer.clear()
+        self._buffer_since = None
+        return dropped
+
+    async def aclose(self):
+        """Flush remaining audio and stop the delay timer"""
+        await self.flush()
+
+    def stats(self) -> dict:
+        """Frame counts and added latency, for tuning `frame_ms` / `max_delay_ms`"""
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "frame_bytes": self._frame_bytes,
+            "parts_in": self.parts_in,
+            "frames_out": self.frames_out,
+            "timer_flushes": self.timer_flushes,
+            "bytes_in": self.bytes_in,
+            "frames_per_second": round(self.frames_out / elapsed, 2),
+            "coalescing_ratio": round(self.parts_in / self.frames_out, 2)
+            if self.frames_out
+            else None,
+            "avg_added_latency_ms": round(
+                1000 * self._latency_total / self.frames_out, 2
+            )
+            if self.frames_out
+            else 0.0,
+            "max_added_latency_ms": round(1000 * self._latency_max, 2),
+        }
+
+    async def _emit(self, frame: bytes):
+        if self._buffer_since is not None:
+            latency = time.monotonic() - self._buffer_since
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+        self._buffer_since = None
+        self.frames_out += 1
+        await self._send(frame)
+
+    def _schedule_flush(self):
+        self._cancel_flush()
+        loop = asyncio.get_running_loop()
+        self._flush_timer = loop.call_later(self._max_delay, self._on_flush_timer)
+
+    def _cancel_flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _on_flush_timer(self):
+        self._flush_timer = None
+        if self._buffer:
+            self.timer_flushes += 1
+            task = asyncio.ensure_future(self.flush())
+            task.add_done_callback(self._log_flush_error)
+
+    @staticmethod
+    def _log_flush_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Delayed audio flush failed: {task.exception()}")
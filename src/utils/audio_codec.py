@@ -1,5 +1,13 @@
 import base64
 import struct
+from typing import Any
+
+import numpy as np
+
+from utils.resampler import StreamingResampler
+
+# Sample rate the Live API expects for realtime audio input
+UPSTREAM_SAMPLE_RATE = 16000
 
 
 class AudioCodec:
@@ -13,12 +21,97 @@ class AudioCodec:
             cls.pcm_to_wav_bytes(base64.b64decode(pcm_data))
         ).decode("utf-8")
 
+    @staticmethod
+    def decode_pcm(pcm_data: str | bytes) -> bytes:
+        """Decode base64 pcm (as yielded by the Live API) into raw PCM bytes"""
+        return base64.b64decode(pcm_data)
+
     @classmethod
-    def to_pcm(cls, wav_data: str) -> str:
-        # return base64.b64encode(
-        #     cls.wav_to_pcm_bytes(base64.b64decode(wav_data))
-        # ).decode("utf-8")
-        raise NotImplementedError
+    def pcm_bytes_to_wav(cls, pcm: bytes) -> str:
+        """Wrap raw PCM bytes in a WAV header and encode it as base64"""
+        return base64.b64encode(cls.pcm_to_wav_bytes(pcm)).decode("utf-8")
+
+    @classmethod
+    def to_pcm(
+        cls, wav_data: str, sample_rate: int = UPSTREAM_SAMPLE_RATE, channels: int = 1
+    ) -> str:
+        """
+        Decode a base64 WAV file (or raw 16-bit PCM at `sample_rate` / `channels`) into
+        base64 16 kHz mono PCM. For a continuous stream use `PcmNormalizer`, which keeps
+        the resampling filter state between chunks.
+        """
+        normalizer = PcmNormalizer(sample_rate=sample_rate, channels=channels)
+        return base64.b64encode(
+            normalizer.to_pcm(base64.b64decode(wav_data), final=True)
+        ).decode("utf-8")
+
+    @staticmethod
+    def parse_wav_bytes(wav: bytes) -> tuple[bytes, int, int, int, int]:
+        """
+        Split a RIFF/WAVE file into its sample data and format.
+
+        returns: (data, sample_rate, channels, sampwidth, format_tag)
+        """
+        data_offset, data_size, fmt = AudioCodec.wav_layout(wav)
+        return (wav[data_offset : data_offset + data_size], *fmt)
+
+    @staticmethod
+    def wav_layout(wav: bytes) -> tuple[int, int, tuple[int, int, int, int]]:
+        """
+        Where a RIFF/WAVE file's sample data starts, its declared size and its format.
+
+        returns: (data_offset, data_size, (sample_rate, channels, sampwidth, format_tag))
+        """
+        if wav[:4] != b"RIFF" or wav[8:12] != b"WAVE":
+            raise ValueError("Not a RIFF/WAVE file")
+
+        fmt = None
+        offset = 12
+        while offset + 8 <= len(wav):
+            chunk_id = wav[offset : offset + 4]
+            (chunk_size,) = struct.unpack("<I", wav[offset + 4 : offset + 8])
+            body = wav[offset + 8 : offset + 8 + chunk_size]
+            if chunk_id == b"fmt ":
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack(
+                    "<HHIIHH", body[:16]
+                )
+                if format_tag == 0xFFFE and len(body) >= 26:
+                    # WAVE_FORMAT_EXTENSIBLE: the real tag leads the sub-format GUID
+                    (format_tag,) = struct.unpack("<H", body[24:26])
+                fmt = (sample_rate, channels, bits // 8, format_tag)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("WAV data chunk before fmt chunk")
+                # Streaming encoders may write a placeholder size
+                return offset + 8, chunk_size, fmt
+            offset += 8 + chunk_size + (chunk_size & 1)
+
+        raise ValueError("WAV file has no data chunk")
+
+    @staticmethod
+    def samples_to_float(
+        data: bytes, sampwidth: int = 2, format_tag: int = 1
+    ) -> np.ndarray:
+        """Interleaved PCM bytes as float32 samples in 16-bit scale"""
+        if format_tag == 3:
+            usable = len(data) - len(data) % sampwidth
+            dtype = "<f4" if sampwidth == 4 else "<f8"
+            return np.frombuffer(data[:usable], dtype=dtype).astype(np.float32) * 32768
+        if sampwidth == 1:
+            return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) * 256
+        if sampwidth == 2:
+            usable = len(data) - len(data) % 2
+            return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32)
+        if sampwidth == 3:
+            raw = np.frombuffer(data[: len(data) - len(data) % 3], dtype=np.uint8)
+            triples = raw.reshape(-1, 3).astype(np.int32)
+            values = triples[:, 0] | (triples[:, 1] << 8) | (triples[:, 2] << 16)
+            values = np.where(values & 0x800000, values - 0x1000000, values)
+            return values.astype(np.float32) / 256
+        if sampwidth == 4:
+            usable = len(data) - len(data) % 4
+            return np.frombuffer(data[:usable], dtype="<i4").astype(np.float32) / 65536
+        raise ValueError(f"Unsupported sample width: {sampwidth}")
 
     @staticmethod
     def pcm_to_wav_bytes(
@@ -56,3 +149,82 @@ class AudioCodec:
             + struct.pack("<I", data_size)
         )
         return header + pcm
+
+
+class PcmNormalizer:
+    """
+    Converts one client's audio stream into the 16 kHz mono 16-bit PCM the Live API
+    expects.
+
+    Chunks may be WAV files (detected by their RIFF header, whose format overrides the
+    declared one) or raw 16-bit PCM at the `sample_rate` / `channels` the client
+    declared. Channels are averaged down to mono and the rate is converted by a
+    `StreamingResampler` that is kept for the whole stream, so chunk boundaries leave
+    no clicks. Audio that is already 16 kHz mono 16-bit is passed through untouched.
+    """
+
+    # Declared raw-PCM formats accepted from clients
+    SAMPLE_RATE_RANGE = (8000, 96000)
+    MAX_CHANNELS = 8
+
+    def __init__(
+        self,
+        sample_rate: int = UPSTREAM_SAMPLE_RATE,
+        channels: int = 1,
+        target_rate: int = UPSTREAM_SAMPLE_RATE,
+    ):
+        self.sample_rate, self.channels = self.check_format(sample_rate, channels)
+        self.target_rate = target_rate
+        self._resampler: StreamingResampler | None = None
+        self._carry = b""
+
+    @classmethod
+    def check_format(cls, sample_rate: Any, channels: Any) -> tuple[int, int]:
+        """A declared raw-PCM format as ints; ValueError if it is not supported"""
+        try:
+            sample_rate, channels = int(sample_rate), int(channels)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Invalid input audio format: {sample_rate!r} Hz, {channels!r} channels")
+        low, high = cls.SAMPLE_RATE_RANGE
+        if not low <= sample_rate <= high:
+            raise ValueError(f"Unsupported input sample rate: {sample_rate}")
+        if not 1 <= channels <= cls.MAX_CHANNELS:
+            raise ValueError(f"Unsupported input channel count: {channels}")
+        return sample_rate, channels
+
+    def to_pcm(self, chunk: bytes, final: bool = False) -> bytes:
+        sample_rate, channels, sampwidth, format_tag = (
+            self.sample_rate,
+            self.channels,
+            2,
+            1,
+        )
+        if chunk[:4] == b"RIFF":
+            chunk, sample_rate, channels, sampwidth, format_tag = (
+                AudioCodec.parse_wav_bytes(chunk)
+            )
+
+        if (
+            sample_rate == self.target_rate
+            and channels == 1
+            and sampwidth == 2
+            and format_tag == 1
+            and not self._carry
+        ):
+            return chunk if not len(chunk) % 2 else chunk[:-1]
+
+        # Keep partial frames for the next chunk so channels never get misaligned
+        frame_bytes = sampwidth * channels
+        data = self._carry + chunk
+        usable = len(data) - len(data) % frame_bytes
+        self._carry = b"" if final else data[usable:]
+
+        samples = AudioCodec.samples_to_float(data[:usable], sampwidth, format_tag)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+
+        resampler = self._resampler
+        if resampler is None or resampler.in_rate != sample_rate:
+            resampler = self._resampler = StreamingResampler(sample_rate, self.target_rate)
+        resampled = resampler.process(samples)
+        return np.clip(np.rint(resampled), -32768, 32767).astype("<i2").tobytes()
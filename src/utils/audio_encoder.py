@@ -0,0 +1,289 @@
+import base64
+import struct
+import time
+from enum import StrEnum
+
+import numpy as np
+
+from utils.audio_codec import AudioCodec
+from utils.resampler import StreamingResampler
+
+# Sample rate of the audio produced by the Live API
+LIVE_OUTPUT_SAMPLE_RATE = 24000
+
+MULAW_BIAS = 0x84
+MULAW_CLIP = 32635
+
+IMA_STEP_TABLE = [
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767,
+]  # fmt: skip
+IMA_INDEX_TABLE = [-1, -1, -1, -1, 2, 4, 6, 8] * 2
+
+
+class OutputCodec(StrEnum):
+    PCM = "pcm"  # 16-bit PCM in a WAV container (the original format)
+    MULAW = "mulaw"  # G.711 mu-law, 8 bits per sample
+    IMA_ADPCM = "ima_adpcm"  # IMA ADPCM, 4 bits per sample
+
+
+def mulaw_encode(samples: np.ndarray) -> np.ndarray:
+    """G.711 mu-law encode 16-bit samples"""
+    samples = samples.astype(np.int32)
+    sign = (samples < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(samples), MULAW_CLIP) + MULAW_BIAS
+    exponent = np.clip(np.frexp(magnitude.astype(np.float32))[1] - 8, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def mulaw_decode(codes: np.ndarray) -> np.ndarray:
+    """G.711 mu-law decode to 16-bit samples"""
+    codes = ~codes.astype(np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    magnitude = (((codes & 0x0F) << 3) + MULAW_BIAS << exponent) - MULAW_BIAS
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+# Header flag: the frame's last nibble is padding, not a sample
+ADPCM_PADDED = 0x01
+
+
+class ImaAdpcmEncoder:
+    """
+    Streaming IMA ADPCM encoder.
+
+    Each encoded frame starts with a 4-byte header `<hBB` holding the predictor and
+    step index *before* the frame's first sample and a flags byte, followed by one
+    4-bit code per sample (low nibble first), so every frame can be decoded on its own.
+    Flag `ADPCM_PADDED` marks a frame of an odd number of samples, whose last high
+    nibble is padding.
+
+    The ADPCM recurrence is inherently sequential, so only the table lookups are
+    precomputed; the per-sample loop runs on plain Python ints, which is faster than
+    NumPy scalar access.
+    """
+
+    def __init__(self):
+        self.predictor = 0
+        self.index = 0
+
+    def encode(self, samples: np.ndarray) -> bytes:
+        header = struct.pack(
+            "<hBB", self.predictor, self.index, ADPCM_PADDED if len(samples) % 2 else 0
+        )
+        predictor, index = self.predictor, self.index
+        step_table, index_table = IMA_STEP_TABLE, IMA_INDEX_TABLE
+        codes = bytearray(len(samples))
+
+        for i, sample in enumerate(samples.tolist()):
+            step = step_table[index]
+            diff = sample - predictor
+            code = 0
+            if diff < 0:
+                code = 8
+                diff = -diff
+            delta = step >> 3
+            if diff >= step:
+                code |= 4
+                diff -= step
+                delta += step
+            step >>= 1
+            if diff >= step:
+                code |= 2
+                diff -= step
+                delta += step
+            step >>= 1
+            if diff >= step:
+                code |= 1
+                delta += step
+
+            predictor = predictor - delta if code & 8 else predictor + delta
+            if predictor > 32767:
+                predictor = 32767
+            elif predictor < -32768:
+                predictor = -32768
+            index += index_table[code]
+            if index < 0:
+                index = 0
+            elif index > 88:
+                index = 88
+            codes[i] = code
+
+        self.predictor, self.index = predictor, index
+
+        nibbles = np.frombuffer(bytes(codes), dtype=np.uint8)
+        if len(nibbles) % 2:
+            nibbles = np.append(nibbles, np.uint8(0))
+        packed = nibbles[0::2] | (nibbles[1::2] << 4)
+        return header + packed.tobytes()
+
+
+def ima_adpcm_decode(frame: bytes, n_samples: int | None = None) -> np.ndarray:
+    """Decode one frame produced by `ImaAdpcmEncoder.encode`"""
+    predictor, index, flags = struct.unpack("<hBB", frame[:4])
+    packed = np.frombuffer(frame[4:], dtype=np.uint8)
+    codes = np.empty(len(packed) * 2, dtype=np.uint8)
+    codes[0::2] = packed & 0x0F
+    codes[1::2] = packed >> 4
+    if n_samples is None:
+        n_samples = len(codes) - (1 if flags & ADPCM_PADDED and len(codes) else 0)
+    codes = codes[:n_samples]
+
+    out = np.empty(len(codes), dtype=np.int16)
+    for i, code in enumerate(codes.tolist()):
+        step = IMA_STEP_TABLE[index]
+        delta = step >> 3
+        if code & 4:
+            delta += step
+        if code & 2:
+            delta += step >> 1
+        if code & 1:
+            delta += step >> 2
+        predictor = predictor - delta if code & 8 else predictor + delta
+        predictor = max(-32768, min(32767, predictor))
+        index = max(0, min(88, index + IMA_INDEX_TABLE[code]))
+        out[i] = predictor
+    return out
+
+
+class OutboundAudioEncoder:
+    """
+    Per-session encoder for the 24 kHz 16-bit PCM produced by the Live API.
+
+    Clients on poor links can negotiate a lower `sample_rate` (16000 or 8000) and a
+    smaller codec; the resampler keeps its state across frames. `pcm` output keeps the
+    WAV container the client already understands, `mulaw` and `ima_adpcm` are sent as
+    raw payloads described by `describe()`.
+    """
+
+    SUPPORTED_RATES = (24000, 16000, 8000)
+
+    def __init__(
+        self, codec: OutputCodec | str = OutputCodec.PCM, sample_rate: int | None = None
+    ):
+        self.codec = OutputCodec(codec)
+        if sample_rate is None:
+            sample_rate = (
+                LIVE_OUTPUT_SAMPLE_RATE if self.codec == OutputCodec.PCM else 8000
+            )
+        if sample_rate not in self.SUPPORTED_RATES:
+            raise ValueError(f"Unsupported output sample rate: {sample_rate}")
+        self.sample_rate = sample_rate
+        self._resampler = StreamingResampler(LIVE_OUTPUT_SAMPLE_RATE, sample_rate)
+        self._adpcm = ImaAdpcmEncoder() if self.codec == OutputCodec.IMA_ADPCM else None
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def is_passthrough(self) -> bool:
+        return self.codec == OutputCodec.PCM and self._resampler.passthrough
+
+    def describe(self) -> dict:
+        """Output format announced to the client in the `connected` message"""
+        return {
+            "codec": self.codec.value,
+            "sample_rate": self.sample_rate,
+            "channels": 1,
+            "container": "wav" if self.codec == OutputCodec.PCM else "raw",
+        }
+
+    def encode(self, pcm: bytes) -> str:
+        """Encode a frame of 24 kHz PCM as a base64 payload"""
+        self.bytes_in += len(pcm)
+        if self.is_passthrough:
+            payload = AudioCodec.pcm_to_wav_bytes(pcm)
+        else:
+            samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % 2], dtype="<i2")
+            resampled = self._resampler.process(samples)
+            samples = np.clip(np.rint(resampled), -32768, 32767).astype(np.int16)
+
+            if self.codec == OutputCodec.MULAW:
+                payload = mulaw_encode(samples).tobytes()
+            elif self.codec == OutputCodec.IMA_ADPCM:
+                payload = self._adpcm.encode(samples)
+            else:
+                payload = AudioCodec.pcm_to_wav_bytes(
+                    samples.astype("<i2").tobytes(), sample_rate=self.sample_rate
+                )
+
+        self.bytes_out += len(payload)
+        return base64.b64encode(payload).decode("utf-8")
+
+    def stats(self) -> dict:
+        return {
+            **self.describe(),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "compression_ratio": round(self.bytes_in / self.bytes_out, 2)
+            if self.bytes_out
+            else None,
+        }
+
+
+def _snr_db(reference: np.ndarray, decoded: np.ndarray) -> float:
+    reference = reference.astype(np.float64)
+    noise = reference - decoded.astype(np.float64)
+    return float(
+        10 * np.log10(np.sum(reference**2) / max(np.sum(noise**2), 1e-12))
+    )
+
+
+def benchmark(seconds: float = 10.0, frame_ms: int = 60) -> dict[str, dict]:
+    """
+    Encoder realtime factor per core, bitrate and SNR for each codec mode, on a
+    speech-like test signal (harmonics with a syllable-rate envelope).
+    """
+    t = np.arange(int(LIVE_OUTPUT_SAMPLE_RATE * seconds)) / LIVE_OUTPUT_SAMPLE_RATE
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / LIVE_OUTPUT_SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)
+    signal = (voiced * envelope * 6000).astype("<i2")
+    frame = LIVE_OUTPUT_SAMPLE_RATE * frame_ms // 1000
+    frames = [signal[i : i + frame].tobytes() for i in range(0, len(signal), frame)]
+
+    modes = [(OutputCodec.PCM, 24000), (OutputCodec.PCM, 16000), (OutputCodec.PCM, 8000)]
+    modes += [(OutputCodec.MULAW, 8000), (OutputCodec.MULAW, 16000)]
+    modes += [(OutputCodec.IMA_ADPCM, 8000), (OutputCodec.IMA_ADPCM, 16000)]
+
+    results = {}
+    for codec, rate in modes:
+        encoder = OutboundAudioEncoder(codec, rate)
+        started = time.process_time()
+        payloads = [base64.b64decode(encoder.encode(f)) for f in frames]
+        elapsed = time.process_time() - started
+
+        # SNR of the codec alone, against the resampled signal it was given
+        reference = StreamingResampler(LIVE_OUTPUT_SAMPLE_RATE, rate).process(signal)
+        reference = np.clip(np.rint(reference), -32768, 32767).astype(np.int16)
+        if codec == OutputCodec.MULAW:
+            decoded = mulaw_decode(np.frombuffer(b"".join(payloads), dtype=np.uint8))
+        elif codec == OutputCodec.IMA_ADPCM:
+            decoded = np.concatenate([ima_adpcm_decode(p) for p in payloads])
+        else:
+            decoded = np.concatenate(
+                [np.frombuffer(p[44:], dtype="<i2") for p in payloads]
+            )
+        n = min(len(reference), len(decoded))
+
+        results[f"{codec.value}@{rate}"] = {
+            "realtime_factor": round(seconds / max(elapsed, 1e-9), 1),
+            "kbps": round(8 * sum(len(p) for p in payloads) / seconds / 1000, 1),
+            "size_vs_pcm24k": round(encoder.bytes_in / encoder.bytes_out, 2),
+            "snr_db": round(_snr_db(reference[:n], decoded[:n]), 1)
+            if codec != OutputCodec.PCM
+            else None,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for mode, result in benchmark().items():
+        print(f"{mode}: {result}")
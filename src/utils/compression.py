@@ -0,0 +1,81 @@
+import time
+import zlib
+from collections import defaultdict
+
+
+class _TypeStats:
+    __slots__ = ("messages", "compressed", "raw_bytes", "sent_bytes", "cpu_ns")
+
+    def __init__(self):
+        self.messages = 0
+        self.compressed = 0
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self.cpu_ns = 0
+
+
+class MessageCompressor:
+    """
+    App-level compression of outbound JSON envelopes, negotiated per session.
+
+    Envelopes of at least `threshold_bytes` of JSON are deflated with zlib
+    and sent as a binary WebSocket frame; everything else, and every type in
+    `skip_types` (base64 audio barely compresses), stays a plain JSON text frame. A
+    compressed frame that would not save at least `min_saving` is sent uncompressed.
+    Clients decode binary frames with `DecompressionStream("deflate")` + `JSON.parse`.
+    """
+
+    def __init__(
+        self,
+        threshold_bytes: int = 1024,
+        level: int = 6,
+        min_saving: float = 0.1,
+        skip_types: frozenset[str] = frozenset({"audio-delta"}),
+    ):
+        self.threshold_bytes = threshold_bytes
+        self._level = level
+        self._min_saving = min_saving
+        self._skip_types = skip_types
+        self._stats: dict[str, _TypeStats] = defaultdict(_TypeStats)
+
+    def describe(self) -> dict:
+        """Compression settings announced to the client in the `connected` message"""
+        return {"encoding": "deflate", "threshold_bytes": self.threshold_bytes}
+
+    def compress(self, type_: str, payload: bytes) -> bytes | None:
+        """Deflated `payload`, or None when it should be sent as a text frame"""
+        stats = self._stats[type_]
+        stats.messages += 1
+        stats.raw_bytes += len(payload)
+
+        if type_ in self._skip_types or len(payload) < self.threshold_bytes:
+            stats.sent_bytes += len(payload)
+            return None
+
+        started = time.perf_counter_ns()
+        compressed = zlib.compress(payload, self._level)
+        stats.cpu_ns += time.perf_counter_ns() - started
+
+        if len(compressed) > len(payload) * (1 - self._min_saving):
+            stats.sent_bytes += len(payload)
+            return None
+
+        stats.compressed += 1
+        stats.sent_bytes += len(compressed)
+        return compressed
+
+    def stats(self) -> dict:
+        """Compression ratio and CPU cost per message type"""
+        return {
+            type_: {
+                "messages": s.messages,
+                "compressed": s.compressed,
+                "raw_bytes": s.raw_bytes,
+                "sent_bytes": s.sent_bytes,
+                "ratio": round(s.raw_bytes / s.sent_bytes, 2) if s.sent_bytes else None,
+                "cpu_us_per_compressed": round(s.cpu_ns / s.compressed / 1000, 1)
+                if s.compressed
+                else 0.0,
+            }
+            for type_, s in self._stats.items()
+        }
@@ -0,0 +1,301 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import time
+from collections import deque
+from collections.abc import Callable
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+
+from utils.audio_codec import AudioCodec, PcmNormalizer
+from utils.audio_encoder import OutboundAudioEncoder
+
+logger = logging.getLogger(__name__)
+
+
+def _make_normalizer(**kwargs) -> Callable[[bytes], bytes]:
+    return PcmNormalizer(**kwargs).to_pcm
+
+
+def _make_encoder(**kwargs) -> Callable[[bytes], bytes]:
+    encoder = OutboundAudioEncoder(**kwargs)
+    return lambda pcm: encoder.encode(pcm).encode("ascii")
+
+
+# Stateful stream processors a worker can host, by name
+PROCESSOR_FACTORIES: dict[str, Callable[..., Callable[[bytes], bytes]]] = {
+    "normalize": _make_normalizer,
+    "encode": _make_encoder,
+}
+# Processors that turn consecutive pieces of a block into the same output as the whole
+# block, so blocks larger than a slot can be sent in pieces. Encoders are not: each
+# call emits one self-contained payload.
+SPLITTABLE_PROCESSORS = {"normalize"}
+
+
+def split_block(data: bytes, max_bytes: int) -> list[bytes]:
+    """
+    `data` as consecutive pieces of at most `max_bytes`. A WAV block is split into
+    WAV pieces sharing its header, so every piece keeps the block's own format.
+    """
+    header = b""
+    align = 2
+    if data[:4] == b"RIFF":
+        data_offset, data_size, (_, channels, sampwidth, _) = AudioCodec.wav_layout(data)
+        header = data[:data_offset]
+        data = data[data_offset : data_offset + data_size]
+        align = max(1, channels * sampwidth)
+    step = (max_bytes - len(header)) // align * align
+    if step <= 0:
+        raise ValueError(f"A {max_bytes} byte slot cannot hold a {len(header)} byte WAV header")
+    return [header + data[i : i + step] for i in range(0, len(data), step)] or [header]
+
+
+def _worker_main(
+    conn: Connection, in_name: str, out_name: str, slot_bytes: int, out_slot_bytes: int
+):
+    """Worker loop: run each request on its stream's processor, in arrival order"""
+    in_shm = SharedMemory(name=in_name)
+    out_shm = SharedMemory(name=out_name)
+    in_buf, out_buf = in_shm.buf, out_shm.buf
+    processors: dict[str, Callable[[bytes], bytes]] = {}
+
+    try:
+        while True:
+            message = conn.recv()
+            op = message[0]
+            if op == "process":
+                _, request_id, stream, slot, length = message
+                offset = slot * slot_bytes
+                try:
+                    result = processors[stream](bytes(in_buf[offset : offset + length]))
+                    if len(result) > out_slot_bytes:
+                        raise ValueError(f"Result of {len(result)} bytes exceeds slot")
+                    out_offset = slot * out_slot_bytes
+                    out_buf[out_offset : out_offset + len(result)] = result
+                    conn.send((request_id, len(result), None))
+                except Exception as e:
+                    conn.send((request_id, -1, repr(e)))
+            elif op == "open":
+                _, stream, kind, kwargs = message
+                try:
+                    processors[stream] = PROCESSOR_FACTORIES[kind](**kwargs)
+                except Exception as e:
+                    logger.error(f"Could not open {kind} stream {stream}: {e}")
+            elif op == "close":
+                processors.pop(message[1], None)
+            elif op == "stop":
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del in_buf, out_buf
+        in_shm.close()
+        out_shm.close()
+
+
+class _Worker:
+    """Parent-side handle of one worker process and its shared-memory rings"""
+
+    def __init__(self, index: int, slots: int, slot_bytes: int, out_slot_bytes: int):
+        self.index = index
+        self.slot_bytes = slot_bytes
+        self.out_slot_bytes = out_slot_bytes
+        self.in_shm = SharedMemory(create=True, size=slots * slot_bytes)
+        self.out_shm = SharedMemory(create=True, size=slots * out_slot_bytes)
+        self.free_slots = deque(range(slots))
+        self.slot_available = asyncio.Semaphore(slots)
+        self.pending: dict[int, tuple[asyncio.Future, int, float]] = {}
+
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self.in_shm.name,
+                self.out_shm.name,
+                slot_bytes,
+                out_slot_bytes,
+            ),
+            name=f"audio-dsp-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.completed = 0
+        self.failed = 0
+        self._roundtrip_total = 0.0
+        self._roundtrip_max = 0.0
+
+    def on_readable(self):
+        """Event-loop reader callback: resolve every finished request"""
+        try:
+            while self.conn.poll():
+                request_id, length, error = self.conn.recv()
+                self._complete(request_id, length, error)
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(self.conn.fileno())
+            self.fail_pending(RuntimeError(f"Audio DSP worker {self.index} exited"))
+
+    def _complete(self, request_id: int, length: int, error: str | None):
+        future, slot, submitted_at = self.pending.pop(request_id)
+        if error is None:
+            offset = slot * self.out_slot_bytes
+            result = bytes(self.out_shm.buf[offset : offset + length])
+        self.free_slots.append(slot)
+        self.slot_available.release()
+
+        roundtrip = time.monotonic() - submitted_at
+        self._roundtrip_total += roundtrip
+        self._roundtrip_max = max(self._roundtrip_max, roundtrip)
+        if future.done():
+            return
+        if error is None:
+            self.completed += 1
+            future.set_result(result)
+        else:
+            self.failed += 1
+            future.set_exception(RuntimeError(f"Audio DSP failed: {error}"))
+
+    def fail_pending(self, error: Exception):
+        for future, _, _ in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "alive": self.process.is_alive(),
+            "pending": len(self.pending),
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_roundtrip_ms": round(1000 * self._roundtrip_total / finished, 3)
+            if finished
+            else 0.0,
+            "max_roundtrip_ms": round(1000 * self._roundtrip_max, 3),
+        }
+
+    def close(self):
+        try:
+            self.conn.send(("stop",))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+        for shm in (self.in_shm, self.out_shm):
+            shm.close()
+            shm.unlink()
+
+
+class AudioDspExecutor:
+    """
+    Runs CPU-heavy audio DSP (resampling, encoding) in a pool of worker processes so
+    the event loop serving every WebSocket stays responsive.
+
+    PCM is passed through per-worker shared-memory rings of fixed-size slots instead of
+    pickling `bytes`; only slot indices travel over the pipe. Each session is pinned to
+    one worker, which hosts that session's stateful processors and handles its requests
+    in order, so per-session ordering and filter state are preserved. Completions are
+    picked up by an event-loop reader on the worker pipe, without helper threads.
+    """
+
+    def __init__(self, workers: int = 2, slots: int = 64, slot_bytes: int = 64 * 1024):
+        self._worker_count = workers
+        self._slots = slots
+        self._slot_bytes = slot_bytes
+        # Room for base64 / container overhead of encoded output
+        self._out_slot_bytes = 2 * slot_bytes + 1024
+        self._workers: list[_Worker] = []
+        self._request_ids = itertools.count()
+        # Display session ids can repeat (one per second), so streams are keyed by this
+        self._session_tokens = itertools.count()
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        for index in range(self._worker_count):
+            worker = _Worker(index, self._slots, self._slot_bytes, self._out_slot_bytes)
+            loop.add_reader(worker.conn.fileno(), worker.on_readable)
+            self._workers.append(worker)
+        logger.info(f"Started {self._worker_count} audio DSP workers")
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            loop.remove_reader(worker.conn.fileno())
+            worker.fail_pending(RuntimeError("Audio DSP executor closed"))
+            worker.close()
+        self._workers.clear()
+
+    def session(self, session_id: str) -> "DspSession":
+        token = next(self._session_tokens)
+        worker = self._workers[token % len(self._workers)]
+        return DspSession(self, worker, f"{session_id}#{token}")
+
+    async def _submit(self, worker: _Worker, stream: str, data: bytes) -> bytes:
+        if len(data) > worker.slot_bytes:
+            raise ValueError(
+                f"Audio block of {len(data)} bytes exceeds the {worker.slot_bytes} byte slot"
+            )
+
+        await worker.slot_available.acquire()
+        slot = worker.free_slots.popleft()
+        request_id = next(self._request_ids)
+        sent = False
+        try:
+            offset = slot * worker.slot_bytes
+            worker.in_shm.buf[offset : offset + len(data)] = data
+            future = asyncio.get_running_loop().create_future()
+            worker.pending[request_id] = (future, slot, time.monotonic())
+            worker.conn.send(("process", request_id, stream, slot, len(data)))
+            sent = True
+        finally:
+            if not sent:
+                # The worker never saw the request, so nothing will free its slot
+                worker.pending.pop(request_id, None)
+                worker.free_slots.append(slot)
+                worker.slot_available.release()
+        return await future
+
+    def stats(self) -> dict:
+        return {f"worker_{w.index}": w.stats() for w in self._workers}
+
+
+class DspSession:
+    """A session's view of the executor: named streams on the session's worker"""
+
+    def __init__(self, executor: AudioDspExecutor, worker: _Worker, session_key: str):
+        self._executor = executor
+        self._worker = worker
+        # Unique per connection, unlike the display session id
+        self._session_key = session_key
+        # Processor kind of each open stream
+        self._streams: dict[str, str] = {}
+
+    def open(self, stream: str, kind: str, **kwargs):
+        """Create a stateful processor (see `PROCESSOR_FACTORIES`) for `stream`"""
+        key = f"{self._session_key}:{stream}"
+        self._worker.conn.send(("open", key, kind, kwargs))
+        self._streams[key] = kind
+
+    async def process(self, stream: str, data: bytes) -> bytes:
+        key = f"{self._session_key}:{stream}"
+        if len(data) <= self._worker.slot_bytes or self._streams.get(key) not in SPLITTABLE_PROCESSORS:
+            return await self._executor._submit(self._worker, key, data)
+        # In order, one at a time: the processor's state carries across the pieces
+        results = []
+        for piece in split_block(data, self._worker.slot_bytes):
+            results.append(await self._executor._submit(self._worker, key, piece))
+        return b"".join(results)
+
+    def close(self):
+        for key in self._streams:
+            try:
+                self._worker.conn.send(("close", key))
+            except (BrokenPipeError, OSError):
+                pass
+        self._streams.clear()
@@ -0,0 +1,111 @@
+import base64
+import json
+import time
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # Installed with fastapi[all]; fall back to the stdlib encoder
+    orjson = None
+
+
+def dumps(value) -> bytes:
+    """Compact UTF-8 JSON, via orjson when it is available"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits, which the stdlib encoder accepts
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class EnvelopeEncoder:
+    """
+    Serializes the `{"type", "data", "session_id", "timestamp"}` envelope of every
+    outbound message.
+
+    The `"type"` prefix of each message type and the session-constant suffix are
+    encoded once and reused, so only `data` goes through the JSON encoder. Timestamps
+    are whole milliseconds on the monotonic clock since `started_at` (announced once
+    in the `connected` message) instead of a wall-clock ISO string per message, and
+    are left out entirely when `timestamps` is False.
+    """
+
+    def __init__(self, session_id: str, timestamps: bool = True):
+        self.session_id = session_id
+        self.timestamps = timestamps
+        self.started_at = datetime.now().isoformat()
+        self._started = time.monotonic()
+        self._prefixes: dict[str, bytes] = {}
+
+        suffix = b',"session_id":' + dumps(session_id)
+        self._suffix = suffix + b',"timestamp":' if timestamps else suffix + b"}"
+
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self._started) * 1000)
+
+    def encode(self, type_: str, data) -> bytes:
+        """The complete envelope as UTF-8 JSON"""
+        prefix = self._prefixes.get(type_)
+        if prefix is None:
+            prefix = self._prefixes[type_] = b'{"type":' + dumps(type_) + b',"data":'
+        if self.timestamps:
+            return b"%b%b%b%d}" % (prefix, dumps(data), self._suffix, self.elapsed_ms())
+        return prefix + dumps(data) + self._suffix
+
+    def encode_text(self, type_: str, data) -> str:
+        return self.encode(type_, data).decode("utf-8")
+
+
+def benchmark(messages: int = 20000) -> dict[str, dict]:
+    """
+    Messages per second per core for the stdlib envelope `send_json_streaming` used to
+    build (a fresh dict, an ISO timestamp and `json.dumps` as in `WebSocket.send_json`)
+    against `EnvelopeEncoder`, for typical outbound payloads.
+    """
+    session_id = "session_20250101_000000"
+    payloads = {
+        "audio-delta": base64.b64encode(bytes(range(256)) * 12).decode("ascii"),
+        "output_transcription-delta": "مرحبا بك في مشروع ",
+        "tool_call_response": [
+            {"unit_code": f"A-{i}", "type": "شقة", "bedrooms": 2, "price": 1250000}
+            for i in range(10)
+        ],
+    }
+
+    def legacy(type_: str, data) -> str:
+        return json.dumps(
+            {
+                "type": type_,
+                "data": data,
+                "session_id": session_id,
+                "timestamp": datetime.now().isoformat(),
+            },
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+
+    encoder = EnvelopeEncoder(session_id)
+    untimed = EnvelopeEncoder(session_id, timestamps=False)
+    candidates = {
+        "stdlib": legacy,
+        "fast": encoder.encode_text,
+        "fast_no_timestamp": untimed.encode_text,
+    }
+
+    results = {}
+    for type_, data in payloads.items():
+        results[type_] = {}
+        for name, encode in candidates.items():
+            started = time.process_time()
+            for _ in range(messages):
+                encode(type_, data)
+            elapsed = time.process_time() - started
+            results[type_][name] = round(messages / max(elapsed, 1e-9))
+    results["backend"] = "orjson" if orjson is not None else "json"
+    return results
+
+
+if __name__ == "__main__":
+    for type_, result in benchmark().items():
+        print(f"{type_}: {result}")
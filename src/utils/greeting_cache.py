@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Live API output audio: 24 kHz, 16-bit mono PCM
+BYTES_PER_SECOND = 24000 * 2
+
+
+@dataclass(slots=True)
+class Greeting:
+    audio: bytes
+    transcript: str
+    created_at: float
+    # The greeting turn's `finalize_response` payload, replayed as its tool response
+    response: dict | None = None
+
+
+class GreetingCache:
+    """
+    On-disk cache of model-generated greetings (raw PCM plus transcript) per persona:
+    voice, dialect, language and agent name. Entries expire after `ttl_s`; beyond
+    `max_entries` the least recently used ones are evicted.
+
+    Each entry is a `<key>.pcm` / `<key>.json` pair written atomically, so a cache
+    directory shared by several workers never exposes a half-written greeting.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 64, ttl_s: float = 7 * 86400):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        os.makedirs(directory, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @staticmethod
+    def key(voice: str, dialect: str, language: str, agent_name: str) -> str:
+        persona = json.dumps([voice, dialect, language, agent_name], ensure_ascii=False)
+        return hashlib.sha1(persona.encode("utf-8")).hexdigest()[:16]
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return f"{base}.pcm", f"{base}.json"
+
+    def get(self, key: str) -> Greeting | None:
+        audio_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if time.time() - meta["created_at"] > self.ttl_s:
+                self.expired += 1
+                self._remove(key)
+                self.misses += 1
+                return None
+            with open(audio_path, "rb") as f:
+                audio = f.read()
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        # Recency for LRU eviction
+        os.utime(meta_path)
+        self.hits += 1
+        return Greeting(
+            audio=audio,
+            transcript=meta["transcript"],
+            created_at=meta["created_at"],
+            response=meta.get("response"),
+        )
+
+    def put(
+        self,
+        key: str,
+        audio: bytes,
+        transcript: str,
+        response: dict | None = None,
+        persona: dict | None = None,
+    ):
+        audio_path, meta_path = self._paths(key)
+        meta = {
+            "created_at": time.time(),
+            "transcript": transcript,
+            "response": response,
+            "persona": persona or {},
+        }
+        try:
+            for path, content, mode in (
+                (audio_path, audio, "wb"),
+                (meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"), "wb"),
+            ):
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, mode) as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to store greeting {key}: {e}")
+            return
+        self.stores += 1
+        logger.info(f"Stored greeting {key}: {len(audio) / BYTES_PER_SECOND:.1f}s of audio")
+        self._evict()
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    used_at = os.path.getmtime(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((used_at, name[: -len(".json")]))
+        entries.sort()
+        for _, key in entries[: max(0, len(entries) - self.max_entries)]:
+            self._remove(key)
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "stores": self.stores,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+class GreetingRecorder:
+    """
+    Captures the model's reply to `GREETING_INSTRUCTION` as a session's greeting.
+    Greetings are replayed to other callers, so nothing is kept once the caller has
+    said or typed anything, or if the turn was interrupted, called a tool other than
+    `response_tool` (through which every reply is delivered), or its audio is outside
+    the accepted duration.
+    """
+
+    def __init__(
+        self, min_s: float = 0.5, max_s: float = 15.0, response_tool: str = "finalize_response"
+    ):
+        self._min_bytes = int(min_s * BYTES_PER_SECOND)
+        self._max_bytes = int(max_s * BYTES_PER_SECOND)
+        self._response_tool = response_tool
+        self._audio = bytearray()
+        self._transcript: list[str] = []
+        self._response: dict | None = None
+        self.active = True
+
+    def add_audio(self, pcm: bytes):
+        if self.active:
+            self._audio += pcm
+            if len(self._audio) > self._max_bytes:
+                self.abandon()
+
+    def add_transcript(self, text: str):
+        if self.active:
+            self._transcript.append(text)
+
+    def add_tool_response(self, name: str | None, payload: dict):
+        if not self.active:
+            return
+        if name == self._response_tool and self._response is None:
+            self._response = payload
+        else:
+            # A lookup (or a second reply) is not a greeting
+            self.abandon()
+
+    def abandon(self):
+        self.active = False
+        self._audio.clear()
+        self._transcript.clear()
+        self._response = None
+
+    def finish(self) -> tuple[bytes, str, dict | None] | None:
+        """The recorded greeting at the end of the first turn, if it qualifies"""
+        if not self.active:
+            return None
+        self.active = False
+        transcript = "".join(self._transcript).strip()
+        if len(self._audio) < self._min_bytes or not transcript:
+            return None
+        return bytes(self._audio), transcript, self._response
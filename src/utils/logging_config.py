@@ -0,0 +1,140 @@
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(session)s turn=%(turn)s] %(message)s"
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class LogContext:
+    """
+    Structured fields attached to every record logged while it is bound, plus the
+    session's rate limiter for high-frequency events.
+
+    It is bound once per session with `bind()`, before the session's tasks are created,
+    so all of them see it; `turn` is mutated in place as turns complete.
+    """
+
+    __slots__ = ("session", "turn", "limiter")
+
+    def __init__(self, session: str = "-", rate_per_s: float = 1.0, burst: int = 5):
+        self.session = session
+        self.turn = 0
+        self.limiter = RateLimiter(rate_per_s, burst)
+
+    def bind(self) -> "LogContext":
+        _context.set(self)
+        return self
+
+
+_context: contextvars.ContextVar[LogContext | None] = contextvars.ContextVar(
+    "log_context", default=None
+)
+
+
+class RateLimiter:
+    """Token bucket per event key; counts what it suppresses"""
+
+    __slots__ = ("_rate", "_burst", "_buckets")
+
+    def __init__(self, rate_per_s: float = 1.0, burst: int = 5):
+        self._rate = rate_per_s
+        self._burst = burst
+        # event -> [tokens, last refill, suppressed since last emitted record]
+        self._buckets: dict[str, list] = {}
+
+    def allow(self, event: str) -> tuple[bool, int]:
+        """Whether `event` may be logged now, and how many were suppressed before it"""
+        now = time.monotonic()
+        bucket = self._buckets.get(event)
+        if bucket is None:
+            bucket = self._buckets[event] = [float(self._burst), now, 0]
+        tokens = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            bucket[2] += 1
+            return False, 0
+        bucket[0] = tokens - 1
+        suppressed, bucket[2] = bucket[2], 0
+        return True, suppressed
+
+
+def log_sampled(logger: logging.Logger, level: int, event: str, msg: str, *args):
+    """
+    Log a high-frequency event (e.g. one per audio chunk) through the current session's
+    rate limiter. Costs a level check when `level` is disabled for `logger`.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    context = _context.get()
+    if context is not None:
+        allowed, suppressed = context.limiter.allow(event)
+        if not allowed:
+            return
+        if suppressed:
+            msg = f"{msg} (+{suppressed} suppressed)"
+    logger.log(level, msg, *args)
+
+
+class _ContextFilter(logging.Filter):
+    """Copies the bound `LogContext` onto records, in the thread that logs them"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _context.get()
+        record.session = context.session if context else "-"
+        record.turn = context.turn if context else "-"
+        return True
+
+
+def parse_levels(spec: str) -> dict[str, str]:
+    """`"google_genai=ERROR,utils.audio_aggregator=WARNING"` -> {logger: level}"""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: str = "INFO", module_levels: dict[str, str] | None = None):
+    """
+    Route all logging through a queue to a background writer thread, so the event
+    loop never blocks on stderr, and apply per-module levels. Safe to call again.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
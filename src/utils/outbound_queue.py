@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import IntEnum, StrEnum
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class SendPriority(IntEnum):
+    """Lower values are written to the client first"""
+
+    CONTROL = 0
+    TRANSCRIPT = 1
+    AUDIO = 2
+
+
+class OverflowPolicy(StrEnum):
+    DROP_OLDEST_AUDIO = "drop_oldest_audio"
+    DISCONNECT = "disconnect"
+
+
+class OutboundQueueOverflow(Exception):
+    """Raised when the queue is full and the policy is to give up on the client"""
+
+
+@dataclass(slots=True)
+class OutboundMessage:
+    type: str
+    data: Any
+    priority: SendPriority
+    generation: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    interruption: bool = False
+
+
+class OutboundQueue:
+    """
+    Bounded per-session queue between the Live API receive loop and the client socket.
+
+    Producers call `put()`, which never waits on the client. A dedicated writer task
+    (`run()`) drains the queue in priority order, so one slow client write can no longer
+    stall draining of the Live session. When the queue is full, the overflow policy
+    either evicts the oldest queued audio or disconnects the client.
+
+    Audio is tagged with the current generation; `interrupt()` starts a new generation,
+    discards all pending audio of the interrupted one and puts the interruption
+    notice at the very front of the queue.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, Any], Awaitable[None]],
+        max_size: int = 256,
+        overflow_policy: OverflowPolicy | str = OverflowPolicy.DROP_OLDEST_AUDIO,
+        send_timeout: float = 10.0,
+    ):
+        self._send = send
+        self._max_size = max_size
+        self._overflow_policy = OverflowPolicy(overflow_policy)
+        self._send_timeout = send_timeout
+        self._queues: dict[SendPriority, deque[OutboundMessage]] = {
+            priority: deque() for priority in SendPriority
+        }
+        self._size = 0
+        self._not_empty = asyncio.Event()
+        self._generation = 0
+
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self.interruptions = 0
+        self.stale_audio_dropped = 0
+        self._interrupt_latency_total = 0.0
+        self._interrupt_latency_max = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    async def put(
+        self,
+        type_: str,
+        data: Any,
+        priority: SendPriority = SendPriority.CONTROL,
+        generation: int | None = None,
+    ):
+        """
+        Queue a message for the writer task without waiting on the client.
+        Producers that await between reading `generation` and calling `put` pass the
+        generation they started in, so audio finished after an interruption stays stale.
+        """
+        if priority == SendPriority.AUDIO and generation is not None:
+            if generation < self._generation:
+                self.stale_audio_dropped += 1
+                return
+        if self._size >= self._max_size:
+            self._handle_overflow(priority)
+            if self._size >= self._max_size:
+                # The incoming audio itself was the one dropped
+                return
+
+        self._queues[priority].append(
+            OutboundMessage(
+                type_,
+                data,
+                priority,
+                self._generation if generation is None else generation,
+            )
+        )
+        self._size += 1
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._size)
+        self._not_empty.set()
+
+    async def interrupt(
+        self,
+        type_: str,
+        data: Any,
+        generation: int,
+        received_at: float | None = None,
+    ):
+        """
+        Discard pending audio from before `generation` and send the interruption
+        notice ahead of everything else queued. `received_at` is the monotonic time
+        the server reported the interruption, used for the notification latency gauge.
+        """
+        self._generation = max(self._generation, generation)
+        self.stale_audio_dropped += self._purge_stale_audio()
+
+        self._queues[SendPriority.CONTROL].appendleft(
+            OutboundMessage(
+                type_,
+                data,
+                SendPriority.CONTROL,
+                self._generation,
+                received_at if received_at is not None else time.monotonic(),
+                interruption=True,
+            )
+        )
+        self._size += 1
+        self.enqueued += 1
+        self.interruptions += 1
+        self.max_depth = max(self.max_depth, self._size)
+        self._not_empty.set()
+
+    async def run(self):
+        """Writer task: send queued messages to the client in priority order"""
+        while True:
+            await self._not_empty.wait()
+            message = self._pop()
+            if message is None:
+                self._not_empty.clear()
+                continue
+
+            if (
+                message.priority == SendPriority.AUDIO
+                and message.generation < self._generation
+            ):
+                self.stale_audio_dropped += 1
+                continue
+
+            waited = time.monotonic() - message.enqueued_at
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+            try:
+                await asyncio.wait_for(
+                    self._send(message.type, message.data), timeout=self._send_timeout
+                )
+            except asyncio.TimeoutError:
+                raise OutboundQueueOverflow(
+                    f"Client write of {message.type} exceeded {self._send_timeout}s"
+                )
+            self.sent += 1
+
+            if message.interruption:
+                latency = time.monotonic() - message.enqueued_at
+                self._interrupt_latency_total += latency
+                self._interrupt_latency_max = max(self._interrupt_latency_max, latency)
+
+    def stats(self) -> dict:
+        """Queue depth and time-in-queue gauges"""
+        return {
+            "depth": self._size,
+            "depth_by_priority": {
+                priority.name.lower(): len(queue)
+                for priority, queue in self._queues.items()
+            },
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "avg_time_in_queue_ms": round(1000 * self._wait_total / self.sent, 2)
+            if self.sent
+            else 0.0,
+            "max_time_in_queue_ms": round(1000 * self._wait_max, 2),
+            "interruptions": self.interruptions,
+            "stale_audio_dropped": self.stale_audio_dropped,
+            "avg_interruption_latency_ms": round(
+                1000 * self._interrupt_latency_total / self.interruptions, 2
+            )
+            if self.interruptions
+            else 0.0,
+            "max_interruption_latency_ms": round(
+                1000 * self._interrupt_latency_max, 2
+            ),
+        }
+
+    def _pop(self) -> OutboundMessage | None:
+        for priority in SendPriority:
+            queue = self._queues[priority]
+            if queue:
+                self._size -= 1
+                return queue.popleft()
+        return None
+
+    def _purge_stale_audio(self) -> int:
+        audio = self._queues[SendPriority.AUDIO]
+        kept = deque(m for m in audio if m.generation >= self._generation)
+        purged = len(audio) - len(kept)
+        self._queues[SendPriority.AUDIO] = kept
+        self._size -= purged
+        return purged
+
+    def _handle_overflow(self, incoming: SendPriority):
+        if self._overflow_policy == OverflowPolicy.DISCONNECT:
+            raise OutboundQueueOverflow(
+                f"Outbound queue full ({self._max_size} messages)"
+            )
+
+        audio = self._queues[SendPriority.AUDIO]
+        if audio:
+            audio.popleft()
+            self._size -= 1
+            self.dropped += 1
+        elif incoming == SendPriority.AUDIO:
+            self.dropped += 1
+        else:
+            # Nothing left to shed: the client is not keeping up even with control frames
+            raise OutboundQueueOverflow(
+                f"Outbound queue full ({self._max_size} non-audio messages)"
+            )
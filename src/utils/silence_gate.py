@@ -0,0 +1,207 @@
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def frame_features(
+    samples: np.ndarray, frame_len: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-frame energy (dBFS) and zero-crossing rate of 16-bit PCM samples.
+
+    Computed for all frames at once; a trailing partial frame is included as its own
+    (shorter) frame so no samples are left unclassified.
+    """
+    n_full = len(samples) // frame_len
+    full = samples[: n_full * frame_len].reshape(n_full, frame_len).astype(np.float32)
+    energy = np.mean(full * full, axis=1)
+    signs = np.signbit(full)
+    crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+    zcr = crossings / max(frame_len - 1, 1)
+
+    tail = samples[n_full * frame_len :].astype(np.float32)
+    if len(tail):
+        tail_signs = np.signbit(tail)
+        energy = np.append(energy, np.mean(tail * tail))
+        zcr = np.append(
+            zcr,
+            np.count_nonzero(tail_signs[1:] != tail_signs[:-1]) / max(len(tail) - 1, 1),
+        )
+
+    rms = np.sqrt(energy)
+    energy_db = 20 * np.log10(np.maximum(rms, 1.0) / 32768.0)
+    return energy_db, zcr
+
+
+class SilenceGate:
+    """
+    Energy/zero-crossing voice-activity gate for 16-bit mono microphone PCM.
+
+    Only speech is forwarded upstream, together with `prefix_ms` of audio from before
+    speech onset and `suffix_ms` of hangover after it. When the gate closes an
+    audio-stream-end marker is sent so the Live API's own VAD finalizes the turn, and
+    while closed an optional keep-alive frame of digital silence is sent every
+    `keepalive_ms` of input.
+
+    The speech threshold adapts to the background level: a frame counts as speech when
+    it is `margin_db` above the noise floor (the quietest frame of the last
+    `noise_window_ms`, so steady hum is tracked) and above `min_speech_db`, and its
+    zero-crossing rate is below `max_zcr` (which rejects broadband hiss).
+    """
+
+    # Frame margins above the noise floor for the Live API start sensitivities
+    SENSITIVITY_MARGIN_DB = {"high": 6.0, "low": 12.0}
+
+    def __init__(
+        self,
+        send_audio: Callable[[bytes], Awaitable[None]],
+        send_stream_end: Callable[[], Awaitable[None]],
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        prefix_ms: int = 300,
+        suffix_ms: int = 1200,
+        margin_db: float = 6.0,
+        min_speech_db: float = -50.0,
+        max_zcr: float = 0.5,
+        noise_window_ms: int = 3000,
+        keepalive_ms: int = 0,
+    ):
+        self._send_audio = send_audio
+        self._send_stream_end = send_stream_end
+        self._frame_len = max(1, sample_rate * frame_ms // 1000)
+        self._frame_ms = frame_ms
+        self._prefix_frames = prefix_ms // frame_ms
+        self._suffix_frames = suffix_ms // frame_ms
+        self._keepalive_frames = keepalive_ms // frame_ms if keepalive_ms else 0
+        self._margin_db = margin_db
+        self._min_speech_db = min_speech_db
+        self._max_zcr = max_zcr
+
+        self._noise_history: deque[float] = deque(
+            maxlen=max(noise_window_ms // frame_ms, 1)
+        )
+        self._prefix: deque[bytes] = deque(maxlen=max(self._prefix_frames, 1))
+        self._open = False
+        self._hangover = 0
+        self._silent_frames = 0
+
+        self.frames_in = 0
+        self.speech_frames = 0
+        self.bytes_in = 0
+        self.bytes_sent = 0
+        self.stream_ends = 0
+        self.keepalives = 0
+
+    @classmethod
+    def from_vad_config(
+        cls,
+        send_audio: Callable[[bytes], Awaitable[None]],
+        send_stream_end: Callable[[], Awaitable[None]],
+        vad_config: dict,
+        **kwargs,
+    ) -> "SilenceGate":
+        """
+        Build a gate whose padding and sensitivity line up with the `VAD_*` settings
+        passed to `LiveAgent`, so the server-side VAD still sees a full speech onset
+        and a full end-of-speech silence before the gate closes.
+        """
+        silence_ms = vad_config.get("VAD_SILENCE_DURATION_MS") or 1000
+        kwargs.setdefault("prefix_ms", vad_config.get("VAD_PREFIX_PADDING_MS") or 300)
+        kwargs.setdefault("suffix_ms", silence_ms + 200)
+        kwargs.setdefault(
+            "margin_db",
+            cls.SENSITIVITY_MARGIN_DB.get(
+                vad_config.get("VAD_START_SENSITIVITY", "high"), 6.0
+            ),
+        )
+        return cls(send_audio, send_stream_end, **kwargs)
+
+    async def process(self, pcm: bytes):
+        """
+        Classify a block of PCM and forward the parts that should reach the model. A
+        block is split where the gate closes, so each stream-end marker follows exactly
+        the speech it ends.
+        """
+        if not pcm:
+            return
+        self.bytes_in += len(pcm)
+
+        samples = np.frombuffer(pcm[: len(pcm) - len(pcm) % 2], dtype="<i2")
+        energy_db, zcr = frame_features(samples, self._frame_len)
+        frame_bytes = self._frame_len * 2
+        outgoing = bytearray()
+
+        for i, (db, z) in enumerate(zip(energy_db.tolist(), zcr.tolist())):
+            frame = pcm[i * frame_bytes : (i + 1) * frame_bytes]
+            self.frames_in += 1
+            self._noise_history.append(db)
+            threshold = max(self._min_speech_db, self._noise_floor_db() + self._margin_db)
+            is_speech = db >= threshold and z <= self._max_zcr
+
+            if is_speech:
+                self.speech_frames += 1
+                if not self._open:
+                    self._open = True
+                    for buffered in self._prefix:
+                        outgoing.extend(buffered)
+                    self._prefix.clear()
+                self._hangover = self._suffix_frames
+                self._silent_frames = 0
+                outgoing.extend(frame)
+                continue
+
+            if self._open:
+                outgoing.extend(frame)
+                self._hangover -= 1
+                if self._hangover <= 0:
+                    self._open = False
+                    await self._forward(outgoing)
+                    outgoing = bytearray()
+                    self.stream_ends += 1
+                    await self._send_stream_end()
+                continue
+
+            if self._prefix_frames:
+                self._prefix.append(frame)
+            self._silent_frames += 1
+            if self._keepalive_frames and self._silent_frames >= self._keepalive_frames:
+                self._silent_frames = 0
+                self.keepalives += 1
+                outgoing.extend(bytes(len(frame)))
+
+        await self._forward(outgoing)
+
+    async def _forward(self, outgoing: bytearray):
+        if outgoing:
+            self.bytes_sent += len(outgoing)
+            await self._send_audio(bytes(outgoing))
+
+    def reset(self):
+        """Close the gate without sending a marker (the client ended the stream itself)"""
+        self._open = False
+        self._hangover = 0
+        self._silent_frames = 0
+        self._prefix.clear()
+
+    def stats(self) -> dict:
+        return {
+            "frames_in": self.frames_in,
+            "speech_frames": self.speech_frames,
+            "bytes_in": self.bytes_in,
+            "bytes_sent": self.bytes_sent,
+            "sent_ratio": round(self.bytes_sent / self.bytes_in, 3)
+            if self.bytes_in
+            else None,
+            "stream_ends": self.stream_ends,
+            "keepalives": self.keepalives,
+            "noise_floor_db": round(self._noise_floor_db(), 1),
+        }
+
+    def _noise_floor_db(self) -> float:
+        if not self._noise_history:
+            return self._min_speech_db - self._margin_db
+        return min(self._noise_history)
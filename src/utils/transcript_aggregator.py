@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+import unicodedata
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def is_boundary(char: str) -> bool:
+    """Whitespace or punctuation, including Arabic marks such as ، ؛ ؟ and ۔"""
+    return char.isspace() or unicodedata.category(char).startswith("P")
+
+
+def is_sentence_end(char: str) -> bool:
+    return char in ".!?؟;؛…۔\n"
+
+
+def is_combining(char: str) -> bool:
+    """Arabic harakat, shadda, superscript alef and other combining marks"""
+    return unicodedata.combining(char) != 0 or unicodedata.category(char) == "Mn"
+
+
+class _Stream:
+    __slots__ = ("buffer", "since", "words", "timer")
+
+    def __init__(self):
+        self.buffer = ""
+        self.since: float | None = None
+        self.words = 0
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class TranscriptAggregator:
+    """
+    Coalesces the one- or two-character transcription deltas from the Live API into
+    word-level deltas.
+
+    A stream (e.g. `output_transcription-delta`) is flushed when a sentence-ending
+    punctuation mark arrives, when `max_words` complete words are buffered, when its
+    oldest character has waited `window_ms`, or at turn completion. Timed flushes cut
+    after the last complete word and hold back a word still streaming in (up to
+    `max_hold_ms`, after which they still never end on a letter whose Arabic
+    diacritics may be on their way), so each delta holds whole words. Whitespace alone
+    is never sent: it is kept to lead the next delta.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, str], Awaitable[None]],
+        window_ms: int = 300,
+        max_words: int = 4,
+        max_hold_ms: int = 1000,
+    ):
+        self._send = send
+        self._window = window_ms / 1000
+        self._max_hold = max(max_hold_ms, window_ms) / 1000
+        self._max_words = max_words
+        self._streams: dict[str, _Stream] = {}
+
+        self.deltas_in = 0
+        self.deltas_out = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    async def push(self, type_: str, text: str):
+        if not text:
+            return
+        self.deltas_in += 1
+        stream = self._streams.setdefault(type_, _Stream())
+        # No timer means an empty buffer, or only held-back whitespace
+        if stream.timer is None:
+            stream.since = time.monotonic()
+            self._schedule(type_, stream)
+
+        # Count words completed by this delta (a boundary following a non-boundary)
+        last = stream.buffer[-1:] if stream.buffer else ""
+        for char in text:
+            if is_boundary(char) and last and not is_boundary(last):
+                stream.words += 1
+            last = char
+        stream.buffer += text
+
+        if is_sentence_end(stream.buffer.rstrip()[-1:] or " ") or (
+            stream.words >= self._max_words and is_boundary(stream.buffer[-1])
+        ):
+            await self._flush(type_, stream, len(stream.buffer))
+
+    async def flush(self, type_: str | None = None):
+        """Flush one stream, or all of them (e.g. on turn completion)"""
+        for name, stream in list(self._streams.items()):
+            if type_ is None or name == type_:
+                await self._flush(name, stream, len(stream.buffer))
+
+    def discard(self):
+        for stream in self._streams.values():
+            self._cancel(stream)
+            stream.buffer = ""
+            stream.words = 0
+            stream.since = None
+
+    def stats(self) -> dict:
+        return {
+            "deltas_in": self.deltas_in,
+            "deltas_out": self.deltas_out,
+            "coalescing_ratio": round(self.deltas_in / self.deltas_out, 2)
+            if self.deltas_out
+            else None,
+            "avg_added_latency_ms": round(
+                1000 * self._latency_total / self.deltas_out, 2
+            )
+            if self.deltas_out
+            else 0.0,
+            "max_added_latency_ms": round(1000 * self._latency_max, 2),
+        }
+
+    async def _flush(self, type_: str, stream: _Stream, cut: int):
+        self._cancel(stream)
+        if cut <= 0 or not stream.buffer:
+            return
+        text, stream.buffer = stream.buffer[:cut], stream.buffer[cut:]
+
+        if stream.since is not None:
+            latency = time.monotonic() - stream.since
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+        stream.words = sum(
+            1
+            for i, char in enumerate(stream.buffer)
+            if is_boundary(char) and i and not is_boundary(stream.buffer[i - 1])
+        )
+        if stream.buffer:
+            stream.since = time.monotonic()
+            self._schedule(type_, stream)
+        else:
+            stream.since = None
+
+        if text.isspace():
+            # Trailing whitespace at turn completion: nothing to show
+            return
+        self.deltas_out += 1
+        await self._send(type_, text)
+
+    @staticmethod
+    def _timed_cut(buffer: str) -> int:
+        """Where a window flush may cut: after the last boundary that follows a word, else 0"""
+        for i in range(len(buffer) - 1, 0, -1):
+            if is_boundary(buffer[i]) and not all(is_boundary(c) for c in buffer[:i]):
+                return i + 1
+        return 0
+
+    @staticmethod
+    def _forced_cut(buffer: str) -> int:
+        """Where a flush past `max_hold_ms` cuts a word: before its last letter and marks"""
+        cut = len(buffer) - 1
+        while cut > 0 and is_combining(buffer[cut]):
+            cut -= 1
+        return cut or len(buffer)
+
+    def _schedule(self, type_: str, stream: _Stream):
+        self._cancel(stream)
+        loop = asyncio.get_running_loop()
+        stream.timer = loop.call_later(self._window, self._on_timer, type_, stream)
+
+    @staticmethod
+    def _cancel(stream: _Stream):
+        if stream.timer is not None:
+            stream.timer.cancel()
+            stream.timer = None
+
+    def _on_timer(self, type_: str, stream: _Stream):
+        stream.timer = None
+        if not stream.buffer:
+            return
+        cut = self._timed_cut(stream.buffer)
+        if not cut:
+            if stream.buffer.isspace():
+                # Kept to lead the next delta; its push starts a new window
+                return
+            waited = time.monotonic() - (stream.since or 0.0)
+            if waited < self._max_hold:
+                # A word still streaming in: wait for its boundary
+                self._schedule(type_, stream)
+                return
+            cut = self._forced_cut(stream.buffer)
+        task = asyncio.ensure_future(self._flush(type_, stream, cut))
+        task.add_done_callback(self._log_flush_error)
+
+    @staticmethod
+    def _log_flush_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Delayed transcript flush failed: {task.exception()}")